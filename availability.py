@@ -4,10 +4,16 @@ from sqlalchemy import and_, or_
 from src.models.availability import VenueAvailability, VenueBlockedDates, VenueOperatingHours, AvailabilityStatus, db
 from src.models.venue import Venue
 from src.models.booking import Booking
+from src.routes.conflicts import check_slot, check_slots, serialize_conflicts
+from src.routes.availability_bitmap import get_day_bitmaps, mark_blocked, refresh_closed, MAX_BITMAP_DAYS, SLOT_MINUTES
+from collections import defaultdict
 import calendar
 
 availability_bp = Blueprint('availability', __name__)
 
+# Upper bound for the multi-venue calendar endpoint
+MAX_CALENDAR_VENUES = 50
+
 @availability_bp.route('/api/availability/venue/<int:venue_id>', methods=['GET'])
 def get_venue_availability(venue_id):
     """Get availability for a specific venue"""
@@ -28,6 +34,19 @@ def get_venue_availability(venue_id):
         # Get venue
         venue = Venue.query.get_or_404(venue_id)
         
+        # Compact bitmap view for clients that poll calendars frequently
+        if request.args.get('view') == 'bitmap':
+            if (end_date - start_date).days + 1 > MAX_BITMAP_DAYS:
+                return jsonify({'success': False, 'error': f'Bitmap range cannot exceed {MAX_BITMAP_DAYS} days'}), 400
+            
+            bitmaps = get_day_bitmaps(venue_id, start_date, end_date)
+            return jsonify({
+                'success': True,
+                'venue_id': venue_id,
+                'slot_minutes': SLOT_MINUTES,
+                'days': [bitmaps[day].to_dict() for day in sorted(bitmaps)]
+            })
+        
         # Get availability slots
         availability_slots = VenueAvailability.query.filter(
             and_(
@@ -67,6 +86,75 @@ def get_venue_availability(venue_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@availability_bp.route('/api/availability/venues', methods=['GET'])
+def get_venues_availability():
+    """Get availability calendars for several venues in one request"""
+    try:
+        try:
+            venue_ids = [int(v) for v in request.args.get('venue_ids', '').split(',') if v.strip()]
+        except ValueError:
+            return jsonify({'success': False, 'error': 'venue_ids must be a comma-separated list of integers'}), 400
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        
+        if not venue_ids:
+            return jsonify({'success': False, 'error': 'venue_ids parameter is required'}), 400
+        
+        if len(venue_ids) > MAX_CALENDAR_VENUES:
+            return jsonify({'success': False, 'error': f'At most {MAX_CALENDAR_VENUES} venues per request'}), 400
+        
+        if not start_date:
+            start_date = date.today()
+        else:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            
+        if not end_date:
+            end_date = start_date + timedelta(days=30)
+        else:
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        
+        # One query per table for all requested venues
+        slots_by_venue = defaultdict(list)
+        for slot in VenueAvailability.query.filter(
+            and_(
+                VenueAvailability.venue_id.in_(venue_ids),
+                VenueAvailability.date >= start_date,
+                VenueAvailability.date <= end_date
+            )
+        ).all():
+            slots_by_venue[slot.venue_id].append(slot)
+        
+        blocked_by_venue = defaultdict(list)
+        for blocked in VenueBlockedDates.query.filter(
+            and_(
+                VenueBlockedDates.venue_id.in_(venue_ids),
+                VenueBlockedDates.start_date <= end_date,
+                VenueBlockedDates.end_date >= start_date
+            )
+        ).all():
+            blocked_by_venue[blocked.venue_id].append(blocked)
+        
+        hours_by_venue = defaultdict(list)
+        for hours in VenueOperatingHours.query.filter(VenueOperatingHours.venue_id.in_(venue_ids)).all():
+            hours_by_venue[hours.venue_id].append(hours)
+        
+        calendars = {}
+        for venue_id in venue_ids:
+            calendars[str(venue_id)] = generate_availability_calendar(
+                venue_id, start_date, end_date,
+                slots_by_venue[venue_id], blocked_by_venue[venue_id], hours_by_venue[venue_id]
+            )
+        
+        return jsonify({
+            'success': True,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'calendars': calendars
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @availability_bp.route('/api/availability/check', methods=['POST'])
 def check_availability():
     """Check if a venue is available for specific date and time"""
@@ -80,71 +168,45 @@ def check_availability():
         # Check if venue exists
         venue = Venue.query.get_or_404(venue_id)
         
-        # Check blocked dates
-        blocked = VenueBlockedDates.query.filter(
-            and_(
-                VenueBlockedDates.venue_id == venue_id,
-                VenueBlockedDates.start_date <= check_date,
-                VenueBlockedDates.end_date >= check_date
-            )
-        ).first()
+        # Run the shared conflict engine (blocked dates, operating hours, bookings and slots)
+        result = check_slot(venue_id, check_date, start_time, end_time)
         
-        if blocked:
+        if result['reason'] == 'blocked':
             return jsonify({
                 'success': True,
                 'available': False,
                 'reason': 'Date is blocked',
-                'blocked_reason': blocked.reason
+                'blocked_reason': result['blocked'].reason
             })
         
-        # Check operating hours
-        day_of_week = check_date.weekday()
-        operating_hours = VenueOperatingHours.query.filter_by(
-            venue_id=venue_id,
-            day_of_week=day_of_week
-        ).first()
-        
-        if operating_hours and operating_hours.is_closed:
+        if result['reason'] == 'closed':
             return jsonify({
                 'success': True,
                 'available': False,
                 'reason': 'Venue is closed on this day'
             })
         
-        if operating_hours:
-            if start_time < operating_hours.open_time or end_time > operating_hours.close_time:
-                return jsonify({
-                    'success': True,
-                    'available': False,
-                    'reason': 'Outside operating hours',
-                    'operating_hours': {
-                        'open': operating_hours.open_time.strftime('%H:%M'),
-                        'close': operating_hours.close_time.strftime('%H:%M')
-                    }
-                })
-        
-        # Check existing bookings
-        conflicting_slots = VenueAvailability.query.filter(
-            and_(
-                VenueAvailability.venue_id == venue_id,
-                VenueAvailability.date == check_date,
-                VenueAvailability.status.in_([AvailabilityStatus.BOOKED, AvailabilityStatus.MAINTENANCE]),
-                or_(
-                    and_(VenueAvailability.start_time <= start_time, VenueAvailability.end_time > start_time),
-                    and_(VenueAvailability.start_time < end_time, VenueAvailability.end_time >= end_time),
-                    and_(VenueAvailability.start_time >= start_time, VenueAvailability.end_time <= end_time)
-                )
-            )
-        ).all()
-        
-        if conflicting_slots:
+        if result['reason'] == 'outside_hours':
+            operating_hours = result['operating_hours']
             return jsonify({
                 'success': True,
                 'available': False,
-                'reason': 'Time slot already booked',
-                'conflicting_slots': [slot.to_dict() for slot in conflicting_slots]
+                'reason': 'Outside operating hours',
+                'operating_hours': {
+                    'open': operating_hours.open_time.strftime('%H:%M'),
+                    'close': operating_hours.close_time.strftime('%H:%M')
+                }
             })
         
+        if result['reason'] == 'conflict':
+            response = {
+                'success': True,
+                'available': False,
+                'reason': 'Time slot already booked'
+            }
+            response.update(serialize_conflicts(result))
+            return jsonify(response)
+        
         return jsonify({
             'success': True,
             'available': True,
@@ -154,6 +216,48 @@ def check_availability():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@availability_bp.route('/api/availability/check-bulk', methods=['POST'])
+def check_availability_bulk():
+    """Check many candidate slots for a venue in a single request"""
+    try:
+        data = request.get_json()
+        venue_id = data.get('venue_id')
+        
+        # Check if venue exists
+        venue = Venue.query.get_or_404(venue_id)
+        
+        slots = []
+        for slot in data.get('slots', []):
+            slots.append((
+                datetime.strptime(slot.get('date'), '%Y-%m-%d').date(),
+                datetime.strptime(slot.get('start_time'), '%H:%M').time(),
+                datetime.strptime(slot.get('end_time'), '%H:%M').time()
+            ))
+        
+        results = []
+        for (slot_date, start_time, end_time), result in zip(slots, check_slots(venue_id, slots)):
+            slot_result = {
+                'date': slot_date.isoformat(),
+                'start_time': start_time.strftime('%H:%M'),
+                'end_time': end_time.strftime('%H:%M'),
+                'available': result['available'],
+                'reason': result['reason']
+            }
+            if result['reason'] == 'blocked':
+                slot_result['blocked_reason'] = result['blocked'].reason
+            elif result['reason'] == 'conflict':
+                slot_result.update(serialize_conflicts(result))
+            results.append(slot_result)
+        
+        return jsonify({
+            'success': True,
+            'venue_id': venue_id,
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @availability_bp.route('/api/availability/venue/<int:venue_id>/block', methods=['POST'])
 def block_venue_dates(venue_id):
     """Block dates for a venue (owner only)"""
@@ -177,6 +281,7 @@ def block_venue_dates(venue_id):
         )
         
         db.session.add(blocked_date)
+        mark_blocked(venue_id, start_date, end_date)
         db.session.commit()
         
         return jsonify({
@@ -202,6 +307,7 @@ def set_operating_hours(venue_id):
         VenueOperatingHours.query.filter_by(venue_id=venue_id).delete()
         
         # Add new operating hours
+        new_hours = []
         for day_data in data.get('operating_hours', []):
             operating_hour = VenueOperatingHours(
                 venue_id=venue_id,
@@ -211,7 +317,9 @@ def set_operating_hours(venue_id):
                 is_closed=day_data.get('is_closed', False)
             )
             db.session.add(operating_hour)
+            new_hours.append(operating_hour)
         
+        refresh_closed(venue_id, new_hours)
         db.session.commit()
         
         return jsonify({
@@ -224,36 +332,52 @@ def set_operating_hours(venue_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 def generate_availability_calendar(venue_id, start_date, end_date, availability_slots, blocked_dates, operating_hours):
-    """Generate a calendar view of availability"""
+    """Generate a calendar view of availability in a single sweep over the date range"""
+    # Bucket slots by date and index hours by weekday once
+    slots_by_date = defaultdict(list)
+    for slot in availability_slots:
+        slots_by_date[slot.date].append(slot)
+    
+    hours_by_weekday = {oh.day_of_week: oh for oh in operating_hours}
+    # Blocked entries sorted by start, keeping their original position so a day
+    # covered by several entries reports the same one as a linear scan would
+    pending_blocks = sorted(enumerate(blocked_dates), key=lambda item: item[1].start_date)
+    active_blocks = []
+    
     calendar_data = {}
+    pending_index = 0
     current_date = start_date
     
     while current_date <= end_date:
-        day_status = get_day_availability_status(
-            venue_id, current_date, availability_slots, blocked_dates, operating_hours
-        )
+        # Activate entries that have started and drop those that ended before today
+        while pending_index < len(pending_blocks) and pending_blocks[pending_index][1].start_date <= current_date:
+            active_blocks.append(pending_blocks[pending_index])
+            pending_index += 1
+        active_blocks = [item for item in active_blocks if item[1].end_date >= current_date]
+        
+        blocked = min(active_blocks, key=lambda item: item[0])[1] if active_blocks else None
         
-        calendar_data[current_date.isoformat()] = day_status
+        calendar_data[current_date.isoformat()] = get_day_availability_status(
+            blocked,
+            hours_by_weekday.get(current_date.weekday()),
+            slots_by_date.get(current_date, [])
+        )
         current_date += timedelta(days=1)
     
     return calendar_data
 
-def get_day_availability_status(venue_id, check_date, availability_slots, blocked_dates, operating_hours):
-    """Get availability status for a specific day"""
+def get_day_availability_status(blocked, operating_hour, day_slots):
+    """Get availability status for a specific day from its pre-bucketed inputs"""
     # Check if date is blocked
-    for blocked in blocked_dates:
-        if blocked.start_date <= check_date <= blocked.end_date:
-            return {
-                'status': 'blocked',
-                'reason': blocked.reason,
-                'available_slots': 0,
-                'total_slots': 0
-            }
+    if blocked:
+        return {
+            'status': 'blocked',
+            'reason': blocked.reason,
+            'available_slots': 0,
+            'total_slots': 0
+        }
     
     # Check operating hours
-    day_of_week = check_date.weekday()
-    operating_hour = next((oh for oh in operating_hours if oh.day_of_week == day_of_week), None)
-    
     if operating_hour and operating_hour.is_closed:
         return {
             'status': 'closed',
@@ -263,7 +387,6 @@ def get_day_availability_status(venue_id, check_date, availability_slots, blocke
         }
     
     # Count availability slots for this date
-    day_slots = [slot for slot in availability_slots if slot.date == check_date]
     available_slots = len([slot for slot in day_slots if slot.status == AvailabilityStatus.AVAILABLE])
     total_slots = len(day_slots)
     
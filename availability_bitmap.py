@@ -0,0 +1,277 @@
+"""Materialized per-venue, per-day availability bitmaps.
+
+Each day is split into 96 fifteen-minute slots. A row keeps three masks for a
+venue and date (booked, blocked, closed) so availability reads become bitwise
+operations. Rows are written only on the write path: a booking materializes
+its day under the reservation lock it already holds, the booking and
+availability routes keep existing rows current before they commit, and
+writes to availability slots are picked up by mapper events. Reads never
+write; days without a row are computed in memory from the source tables.
+``rebuild_bitmaps`` repairs stored rows and precomputes the coming days.
+"""
+from datetime import date, datetime, time, timedelta
+from itertools import product
+from sqlalchemy import and_, event, inspect
+from sqlalchemy.orm import Session, object_session
+from src.models.user import db
+from src.models.venue import Venue
+from src.models.availability import VenueAvailability
+from src.routes.conflicts import VenueSchedule, load_day_indexes
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+# Longest range a single read may compute, and how far ahead rebuilds precompute
+MAX_BITMAP_DAYS = 92
+
+
+class VenueDayBitmap(db.Model):
+    __tablename__ = 'venue_day_bitmaps'
+
+    venue_id = db.Column(db.Integer, db.ForeignKey(Venue.id), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    # Masks are stored as hex strings because 96 bits do not fit in an SQLite integer
+    booked_mask = db.Column(db.String(24), nullable=False, default='0')
+    blocked_mask = db.Column(db.String(24), nullable=False, default='0')
+    closed_mask = db.Column(db.String(24), nullable=False, default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def booked(self):
+        return int(self.booked_mask, 16)
+
+    @property
+    def blocked(self):
+        return int(self.blocked_mask, 16)
+
+    @property
+    def closed(self):
+        return int(self.closed_mask, 16)
+
+    @property
+    def free(self):
+        return FULL_DAY_MASK & ~(self.booked | self.blocked | self.closed)
+
+    def is_free(self, start_time, end_time):
+        """Check whether a time range is free with a single mask test"""
+        wanted = time_range_mask(start_time, end_time)
+        return self.free & wanted == wanted
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'booked': self.booked_mask,
+            'blocked': self.blocked_mask,
+            'closed': self.closed_mask,
+            'free': format(self.free, 'x')
+        }
+
+
+def _hex(mask):
+    return format(mask, 'x')
+
+
+def time_range_mask(start_time, end_time):
+    """Mask of every slot touched by the half-open range [start_time, end_time)"""
+    start_slot = (start_time.hour * 60 + start_time.minute) // SLOT_MINUTES
+    end_minutes = end_time.hour * 60 + end_time.minute + (1 if end_time.second or end_time.microsecond else 0)
+    end_slot = min(-(-end_minutes // SLOT_MINUTES), SLOTS_PER_DAY)
+    if end_slot <= start_slot:
+        return 0
+    return ((1 << (end_slot - start_slot)) - 1) << start_slot
+
+
+def mask_to_ranges(mask):
+    """Convert a slot mask into a list of {'start_time', 'end_time'} ranges"""
+    ranges = []
+    slot = 0
+    while slot < SLOTS_PER_DAY:
+        if mask >> slot & 1:
+            run_start = slot
+            while slot < SLOTS_PER_DAY and mask >> slot & 1:
+                slot += 1
+            ranges.append({
+                'start_time': _slot_label(run_start),
+                'end_time': _slot_label(slot)
+            })
+        else:
+            slot += 1
+    return ranges
+
+
+def _slot_label(slot):
+    minutes = slot * SLOT_MINUTES
+    if minutes >= 24 * 60:
+        return '24:00'
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def _closed_mask(operating_hours):
+    if not operating_hours:
+        return 0
+    if operating_hours.is_closed:
+        return FULL_DAY_MASK
+    if operating_hours.open_time and operating_hours.close_time:
+        return FULL_DAY_MASK & ~time_range_mask(operating_hours.open_time, operating_hours.close_time)
+    return 0
+
+
+def _booked_mask(index):
+    mask = 0
+    for start_time, end_time, source, record in index.find_conflicts(time.min, time.max):
+        mask |= time_range_mask(start_time, end_time)
+    return mask
+
+
+def compute_day_bitmaps(venue_id, dates):
+    """Compute fresh bitmap rows for a venue from the source tables"""
+    schedule = VenueSchedule(venue_id, dates)
+    rows = []
+    for day in dates:
+        rows.append(VenueDayBitmap(
+            venue_id=venue_id,
+            date=day,
+            booked_mask=_hex(_booked_mask(schedule.index_for(day))),
+            blocked_mask=_hex(FULL_DAY_MASK if schedule.blocked_entry(day) else 0),
+            closed_mask=_hex(_closed_mask(schedule.operating_hours.get(day.weekday())))
+        ))
+    return rows
+
+
+def _load_bitmaps(venue_id, start_date, end_date):
+    rows = VenueDayBitmap.query.filter(
+        and_(
+            VenueDayBitmap.venue_id == venue_id,
+            VenueDayBitmap.date >= start_date,
+            VenueDayBitmap.date <= end_date
+        )
+    ).all()
+    return {row.date: row for row in rows}
+
+
+def get_day_bitmaps(venue_id, start_date, end_date):
+    """Return {date: VenueDayBitmap} for a range; missing days are computed but not stored"""
+    if (end_date - start_date).days + 1 > MAX_BITMAP_DAYS:
+        raise ValueError(f'Bitmap range cannot exceed {MAX_BITMAP_DAYS} days')
+
+    bitmaps = _load_bitmaps(venue_id, start_date, end_date)
+
+    missing = []
+    day = start_date
+    while day <= end_date:
+        if day not in bitmaps:
+            missing.append(day)
+        day += timedelta(days=1)
+
+    if missing:
+        for row in compute_day_bitmaps(venue_id, missing):
+            bitmaps[row.date] = row
+
+    return bitmaps
+
+
+def rebuild_bitmaps(days_ahead=MAX_BITMAP_DAYS):
+    """Recompute every stored bitmap row and precompute the coming days
+
+    Active venues get a row for each of the next ``days_ahead`` days. Each
+    venue is rebuilt in its own transaction under the reservation locks of
+    its days. Returns the number of rows created or changed.
+    """
+    # Imported here because the reservation module builds on this module's booking hooks
+    from src.routes.reservation import venue_date_lock, with_reservation_retry
+
+    days_by_venue = {}
+    for venue_id, day in db.session.query(VenueDayBitmap.venue_id, VenueDayBitmap.date).all():
+        days_by_venue.setdefault(venue_id, set()).add(day)
+
+    upcoming = [date.today() + timedelta(days=offset) for offset in range(days_ahead)]
+    for (venue_id,) in db.session.query(Venue.id).filter(Venue.is_active == True).all():
+        days_by_venue.setdefault(venue_id, set()).update(upcoming)
+
+    def rebuild_venue(venue_id, days):
+        changed = 0
+        with venue_date_lock(*[(venue_id, day) for day in days]):
+            stored = {row.date: row for row in VenueDayBitmap.query.filter_by(venue_id=venue_id).all()}
+            for fresh in compute_day_bitmaps(venue_id, days):
+                row = stored.get(fresh.date)
+                masks = (fresh.booked_mask, fresh.blocked_mask, fresh.closed_mask)
+                if row is None:
+                    db.session.add(fresh)
+                    changed += 1
+                elif (row.booked_mask, row.blocked_mask, row.closed_mask) != masks:
+                    row.booked_mask, row.blocked_mask, row.closed_mask = masks
+                    changed += 1
+            db.session.commit()
+        return changed
+
+    return sum(
+        with_reservation_retry(lambda: rebuild_venue(venue_id, days))
+        for venue_id, days in days_by_venue.items()
+    )
+
+
+def mark_booked(venue_id, event_date, start_time, end_time):
+    """Set the booked bits for a new booking, materializing its day if needed
+
+    Callers hold the reservation lock of the day, so no other writer can
+    insert the same row.
+    """
+    row = VenueDayBitmap.query.get((venue_id, event_date))
+    if row is None:
+        row = compute_day_bitmaps(venue_id, [event_date])[0]
+        db.session.add(row)
+    row.booked_mask = _hex(row.booked | time_range_mask(start_time, end_time))
+
+
+def refresh_booked(venue_id, event_date):
+    """Recompute the booked bits of a day after a booking is released"""
+    row = VenueDayBitmap.query.get((venue_id, event_date))
+    if row:
+        index = load_day_indexes(venue_id, [event_date])[event_date]
+        row.booked_mask = _hex(_booked_mask(index))
+
+
+def mark_blocked(venue_id, start_date, end_date):
+    """Set the blocked bits on materialized days inside a blocked range"""
+    VenueDayBitmap.query.filter(
+        and_(
+            VenueDayBitmap.venue_id == venue_id,
+            VenueDayBitmap.date >= start_date,
+            VenueDayBitmap.date <= end_date
+        )
+    ).update({'blocked_mask': _hex(FULL_DAY_MASK)}, synchronize_session=False)
+
+
+def refresh_closed(venue_id, operating_hours):
+    """Recompute the closed bits of materialized days after operating hours change"""
+    masks = {hours.day_of_week: _closed_mask(hours) for hours in operating_hours}
+    for row in VenueDayBitmap.query.filter_by(venue_id=venue_id).all():
+        row.closed_mask = _hex(masks.get(row.date.weekday(), 0))
+
+
+def _slot_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    # A slot moved to another venue or day changes the booked bits of both days
+    state = inspect(target)
+    venue_ids = state.attrs.venue_id.history.sum() or [target.venue_id]
+    days = state.attrs.date.history.sum() or [target.date]
+    session.info.setdefault('bitmap_slot_days', set()).update(product(venue_ids, days))
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(VenueAvailability, _event_name, _slot_changed)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _refresh_slot_days(session, flush_context):
+    # Changes made here are flushed in the same commit
+    for venue_id, day in session.info.pop('bitmap_slot_days', ()):
+        refresh_booked(venue_id, day)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_slot_days(session):
+    session.info.pop('bitmap_slot_days', None)
@@ -1,16 +1,88 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
-from src.models.venue import Venue, EventType
+from src.models.venue import Venue
 from src.models.booking import Booking, Payment, BookingStatus, PaymentStatus, PaymentMethod
-from datetime import datetime, date, time
-from sqlalchemy import and_, or_
+from src.routes.availability_bitmap import refresh_booked
+from src.routes.pagination import cursor_requested, keyset_page
+from src.routes.rollups import VenueDailyRollup, record_booking_status, record_payment
+from src.routes.ledger import amount_paid, payment_status_for, record_paid_payment
+from src.routes.holds import DEFAULT_HOLD_MINUTES, MAX_HOLD_MINUTES, release_hold, serialize_hold
+from src.routes.reservation import place_hold, reserve_booking
+from src.routes.booking_rules import (
+    build_booking, missing_booking_field, parse_booking_slot, slot_error, unavailable_details
+)
+from src.routes.reference_cache import event_type_cache
+from src.routes.booking_import import MAX_IMPORT_ROWS, import_bookings, import_format, parse_import_rows
+from src.routes.fields import FieldSet, requested_fields
+from src.routes.exports import export_columns, export_format, export_response
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, update
+from sqlalchemy.orm import joinedload, selectinload
 import uuid
 
 booking_bp = Blueprint('booking', __name__)
 
-def generate_booking_reference():
-    """Generate unique booking reference"""
-    return f"YQ{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:6].upper()}"
+# SQLite strftime formats for revenue/occupancy buckets (also valid for Python's strftime)
+STATS_BUCKET_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m'
+}
+
+OWNER_STATS_COLUMNS = [
+    'pending_count', 'confirmed_count', 'completed_count', 'cancelled_count', 'guest_count', 'revenue'
+]
+
+STATS_KEYS = [
+    'total_bookings', 'pending_bookings', 'confirmed_bookings', 'completed_bookings',
+    'cancelled_bookings', 'total_revenue', 'occupied_days'
+]
+
+BOOKING_EXPORT_COLUMNS = {
+    'id': Booking.id,
+    'booking_reference': Booking.booking_reference,
+    'venue_id': Booking.venue_id,
+    'customer_id': Booking.customer_id,
+    'event_type_id': Booking.event_type_id,
+    'event_date': Booking.event_date,
+    'start_time': Booking.start_time,
+    'end_time': Booking.end_time,
+    'guest_count': Booking.guest_count,
+    'base_price': Booking.base_price,
+    'additional_charges': Booking.additional_charges,
+    'discount': Booking.discount,
+    'total_amount': Booking.total_amount,
+    'booking_status': Booking.booking_status,
+    'payment_status': Booking.payment_status,
+    'created_at': Booking.created_at
+}
+
+PAYMENT_EXPORT_COLUMNS = {
+    'id': Payment.id,
+    'payment_reference': Payment.payment_reference,
+    'booking_id': Payment.booking_id,
+    'booking_reference': Booking.booking_reference,
+    'venue_id': Booking.venue_id,
+    'event_date': Booking.event_date,
+    'amount': Payment.amount,
+    'payment_method': Payment.payment_method,
+    'payment_status': Payment.payment_status,
+    'transaction_id': Payment.transaction_id,
+    'bank_name': Payment.bank_name
+}
+
+def booking_with_relations(booking_id):
+    """Load a booking with everything its detail view serializes
+
+    Customer, venue and event type come from one joined query; payments and
+    venue images are loaded with one IN query each.
+    """
+    return Booking.query.options(
+        joinedload(Booking.customer),
+        joinedload(Booking.venue).selectinload(Venue.images),
+        joinedload(Booking.event_type),
+        selectinload(Booking.payments)
+    ).filter(Booking.id == booking_id).first_or_404()
 
 @booking_bp.route('', methods=['POST'])
 def create_booking():
@@ -19,12 +91,9 @@ def create_booking():
         data = request.json
         
         # Validate required fields
-        required_fields = ['customer_id', 'venue_id', 'event_type_id', 
-                          'event_date', 'start_time', 'end_time', 'guest_count']
-        
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
+        missing_field = missing_booking_field(data)
+        if missing_field:
+            return jsonify({'error': f'{missing_field} is required'}), 400
         
         # Validate customer exists
         customer = User.query.get(data['customer_id'])
@@ -37,86 +106,35 @@ def create_booking():
             return jsonify({'error': 'Venue not found or inactive'}), 404
         
         # Validate event type
-        event_type = EventType.query.get(data['event_type_id'])
-        if not event_type:
+        if not event_type_cache.get(data['event_type_id']):
             return jsonify({'error': 'Event type not found'}), 404
         
         # Parse date and time
         try:
-            event_date = datetime.strptime(data['event_date'], '%Y-%m-%d').date()
-            start_time = datetime.strptime(data['start_time'], '%H:%M').time()
-            end_time = datetime.strptime(data['end_time'], '%H:%M').time()
-        except ValueError:
-            return jsonify({'error': 'Invalid date or time format'}), 400
-        
-        # Check if date is in the future
-        if event_date <= date.today():
-            return jsonify({'error': 'Event date must be in the future'}), 400
-        
-        # Check if end time is after start time
-        if end_time <= start_time:
-            return jsonify({'error': 'End time must be after start time'}), 400
-        
-        # Check venue availability
-        existing_bookings = Booking.query.filter(
-            and_(
-                Booking.venue_id == data['venue_id'],
-                Booking.event_date == event_date,
-                Booking.booking_status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-                or_(
-                    and_(Booking.start_time <= start_time, Booking.end_time > start_time),
-                    and_(Booking.start_time < end_time, Booking.end_time >= end_time),
-                    and_(Booking.start_time >= start_time, Booking.end_time <= end_time)
-                )
-            )
-        ).first()
+            event_date, start_time, end_time = parse_booking_slot(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if existing_bookings:
-            return jsonify({'error': 'Venue is not available for the selected time slot'}), 409
+        # Check the date is in the future and end time is after start time
+        error = slot_error(event_date, start_time, end_time)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Check capacity
         if data['guest_count'] > venue.capacity:
             return jsonify({'error': f'Guest count exceeds venue capacity ({venue.capacity})'}), 400
         
-        # Calculate pricing
-        duration_hours = (datetime.combine(date.today(), end_time) - 
-                         datetime.combine(date.today(), start_time)).total_seconds() / 3600
+        # Calculate pricing and create booking
+        try:
+            booking = build_booking(data, venue, event_date, start_time, end_time)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if venue.price_per_hour:
-            base_price = venue.price_per_hour * duration_hours
-        elif venue.price_per_day:
-            base_price = venue.price_per_day
-        else:
-            return jsonify({'error': 'Venue pricing not configured'}), 400
-        
-        additional_charges = data.get('additional_charges', 0.0)
-        discount = data.get('discount', 0.0)
-        total_amount = base_price + additional_charges - discount
-        
-        # Create booking
-        booking = Booking(
-            booking_reference=generate_booking_reference(),
-            customer_id=data['customer_id'],
-            venue_id=data['venue_id'],
-            event_type_id=data['event_type_id'],
-            event_date=event_date,
-            start_time=start_time,
-            end_time=end_time,
-            guest_count=data['guest_count'],
-            event_title_en=data.get('event_title_en'),
-            event_title_ar=data.get('event_title_ar'),
-            special_requirements_en=data.get('special_requirements_en'),
-            special_requirements_ar=data.get('special_requirements_ar'),
-            base_price=base_price,
-            additional_charges=additional_charges,
-            discount=discount,
-            total_amount=total_amount,
-            booking_status=BookingStatus.PENDING,
-            payment_status=PaymentStatus.PENDING
-        )
+        # Re-check availability and insert while holding the venue/date lock
+        booking, availability = reserve_booking(booking, hold_token=data.get('hold_token'))
         
-        db.session.add(booking)
-        db.session.commit()
+        if booking is None:
+            return jsonify(unavailable_details(availability)), 409
         
         language = data.get('language', 'ar')
         return jsonify({
@@ -128,16 +146,107 @@ def create_booking():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@booking_bp.route('/batch', methods=['POST'])
+def create_bookings_batch():
+    """Create many bookings from a JSON array, JSON lines or CSV payload"""
+    try:
+        fmt = import_format(request.mimetype)
+        try:
+            rows = parse_import_rows(request.get_data(as_text=True), fmt)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid {fmt} payload: {e}'}), 400
+        
+        if not rows:
+            return jsonify({'error': 'No bookings provided'}), 400
+        
+        if len(rows) > MAX_IMPORT_ROWS:
+            return jsonify({'error': f'At most {MAX_IMPORT_ROWS} bookings per request'}), 400
+        
+        results = import_bookings(rows)
+        created = sum(1 for result in results if result['status'] == 'created')
+        
+        return jsonify({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@booking_bp.route('/holds', methods=['POST'])
+def create_hold():
+    """Hold a venue time slot for a few minutes during checkout"""
+    try:
+        data = request.json
+        
+        # Validate required fields
+        for field in ['venue_id', 'event_date', 'start_time', 'end_time']:
+            if not data.get(field):
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        # Validate venue exists and is active
+        venue = Venue.query.get(data['venue_id'])
+        if not venue or not venue.is_active:
+            return jsonify({'error': 'Venue not found or inactive'}), 404
+        
+        # Parse date and time
+        try:
+            event_date, start_time, end_time = parse_booking_slot(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        error = slot_error(event_date, start_time, end_time)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        minutes = int(data.get('minutes', DEFAULT_HOLD_MINUTES))
+        if minutes < 1 or minutes > MAX_HOLD_MINUTES:
+            return jsonify({'error': f'minutes must be between 1 and {MAX_HOLD_MINUTES}'}), 400
+        
+        hold, availability = place_hold(
+            venue.id, event_date, start_time, end_time,
+            customer_id=data.get('customer_id'), minutes=minutes
+        )
+        
+        if hold is None:
+            return jsonify(unavailable_details(availability)), 409
+        
+        return jsonify({
+            'message': 'Slot held successfully',
+            'hold': serialize_hold(hold)
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@booking_bp.route('/holds/<token>', methods=['DELETE'])
+def delete_hold(token):
+    """Release a slot hold before it expires"""
+    try:
+        if not release_hold(token):
+            return jsonify({'error': 'Hold not found'}), 404
+        
+        db.session.commit()
+        
+        return jsonify({'message': 'Hold released successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @booking_bp.route('/<int:booking_id>', methods=['GET'])
 def get_booking(booking_id):
     """Get booking details"""
     try:
         language = request.args.get('language', 'ar')
-        booking = Booking.query.get_or_404(booking_id)
+        booking = booking_with_relations(booking_id)
         
         booking_data = booking.to_dict(language=language)
         
-        # Add related data
+        # Add related data (already loaded, no lazy loads below)
         booking_data['customer'] = booking.customer.to_dict(language=language)
         booking_data['venue'] = booking.venue.to_dict(language=language)
         booking_data['event_type'] = booking.event_type.to_dict(language=language)
@@ -164,13 +273,16 @@ def get_customer_bookings(customer_id):
         if status:
             query = query.filter(Booking.booking_status == BookingStatus(status))
         
-        query = query.order_by(Booking.created_at.desc())
-        bookings = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        return jsonify({
-            'customer': customer.to_dict(language=language),
-            'bookings': [booking.to_dict(language=language) for booking in bookings.items],
-            'pagination': {
+        if cursor_requested(request.args):
+            # Keyset pagination: no OFFSET scan and no COUNT query
+            booking_items, pagination = keyset_page(
+                query, Booking, per_page, request.args.get('before'), request.args.get('after')
+            )
+        else:
+            query = query.order_by(Booking.created_at.desc())
+            bookings = query.paginate(page=page, per_page=per_page, error_out=False)
+            booking_items = bookings.items
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': bookings.total,
@@ -178,8 +290,15 @@ def get_customer_bookings(customer_id):
                 'has_next': bookings.has_next,
                 'has_prev': bookings.has_prev
             }
+        
+        return jsonify({
+            'customer': customer.to_dict(language=language),
+            'bookings': [booking.to_dict(language=language) for booking in booking_items],
+            'pagination': pagination
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -192,6 +311,8 @@ def get_venue_bookings(venue_id):
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
         
+        fields = requested_fields(request.args)
+        
         venue = Venue.query.get_or_404(venue_id)
         
         query = Booking.query.filter_by(venue_id=venue_id)
@@ -199,13 +320,20 @@ def get_venue_bookings(venue_id):
         if status:
             query = query.filter(Booking.booking_status == BookingStatus(status))
         
-        query = query.order_by(Booking.created_at.desc())
-        bookings = query.paginate(page=page, per_page=per_page, error_out=False)
+        field_set = FieldSet(Booking, fields, BOOKING_EXPORT_COLUMNS) if fields else None
+        if field_set:
+            query = field_set.apply(query)
         
-        return jsonify({
-            'venue': venue.to_dict(language=language),
-            'bookings': [booking.to_dict(language=language) for booking in bookings.items],
-            'pagination': {
+        if cursor_requested(request.args):
+            # Keyset pagination: no OFFSET scan and no COUNT query
+            booking_items, pagination = keyset_page(
+                query, Booking, per_page, request.args.get('before'), request.args.get('after')
+            )
+        else:
+            query = query.order_by(Booking.created_at.desc())
+            bookings = query.paginate(page=page, per_page=per_page, error_out=False)
+            booking_items = bookings.items
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': bookings.total,
@@ -213,8 +341,18 @@ def get_venue_bookings(venue_id):
                 'has_next': bookings.has_next,
                 'has_prev': bookings.has_prev
             }
+        
+        return jsonify({
+            'venue': venue.to_dict(language=language),
+            'bookings': [
+                field_set.serialize(booking, language) if field_set else booking.to_dict(language=language)
+                for booking in booking_items
+            ],
+            'pagination': pagination
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -235,6 +373,7 @@ def confirm_booking(booking_id):
         
         booking.booking_status = BookingStatus.CONFIRMED
         booking.confirmed_at = datetime.utcnow()
+        record_booking_status(booking, BookingStatus.PENDING, BookingStatus.CONFIRMED)
         db.session.commit()
         
         language = data.get('language', 'ar')
@@ -262,11 +401,14 @@ def cancel_booking(booking_id):
         if booking.booking_status in [BookingStatus.CANCELLED, BookingStatus.COMPLETED]:
             return jsonify({'error': 'Booking cannot be cancelled'}), 400
         
+        previous_status = booking.booking_status
         booking.booking_status = BookingStatus.CANCELLED
         booking.cancelled_at = datetime.utcnow()
         booking.cancelled_by_id = user_id
         booking.cancellation_reason_en = data.get('reason_en')
         booking.cancellation_reason_ar = data.get('reason_ar')
+        refresh_booked(booking.venue_id, booking.event_date)
+        record_booking_status(booking, previous_status, BookingStatus.CANCELLED)
         
         db.session.commit()
         
@@ -314,19 +456,18 @@ def create_payment(booking_id):
         
         db.session.add(payment)
         
-        # Update booking payment status
-        total_paid = sum(p.amount for p in booking.payments if p.payment_status == PaymentStatus.PAID)
-        total_paid += amount  # Include current payment
-        
-        if total_paid >= booking.total_amount:
-            booking.payment_status = PaymentStatus.PAID
-        elif total_paid > 0:
-            booking.payment_status = PaymentStatus.PARTIAL
-        
         # For cash payments, mark as paid immediately
         if payment_method == PaymentMethod.CASH:
             payment.payment_status = PaymentStatus.PAID
             payment.paid_at = datetime.utcnow()
+            db.session.flush()
+            total_paid = record_paid_payment(booking, payment)
+            record_payment(booking, amount)
+        else:
+            total_paid = amount_paid(booking) + amount  # Include current payment
+        
+        # Update booking payment status
+        booking.payment_status = payment_status_for(booking, total_paid)
         
         db.session.commit()
         
@@ -355,16 +496,26 @@ def confirm_payment(payment_id):
         if payment.payment_status != PaymentStatus.PENDING:
             return jsonify({'error': 'Payment already processed'}), 400
         
-        payment.payment_status = PaymentStatus.PAID
-        payment.paid_at = datetime.utcnow()
+        # Only flip a still-pending payment so concurrent confirmations cannot both count it
+        result = db.session.execute(
+            update(Payment).where(and_(
+                Payment.id == payment.id,
+                Payment.payment_status == PaymentStatus.PENDING
+            )).values(
+                payment_status=PaymentStatus.PAID,
+                paid_at=datetime.utcnow()
+            ).execution_options(synchronize_session='evaluate')
+        )
         
-        # Update booking payment status
-        total_paid = sum(p.amount for p in booking.payments if p.payment_status == PaymentStatus.PAID)
+        if result.rowcount == 0:
+            db.session.rollback()
+            return jsonify({'error': 'Payment already processed'}), 400
         
-        if total_paid >= booking.total_amount:
-            booking.payment_status = PaymentStatus.PAID
-        elif total_paid > 0:
-            booking.payment_status = PaymentStatus.PARTIAL
+        total_paid = record_paid_payment(booking, payment)
+        record_payment(booking, payment.amount)
+        
+        # Update booking payment status
+        booking.payment_status = payment_status_for(booking, total_paid)
         
         db.session.commit()
         
@@ -377,44 +528,204 @@ def confirm_payment(payment_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def filter_export_query(query, args):
+    """Apply the date range, venue, owner and booking status export filters (query must include Booking)"""
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    venue_id = args.get('venue_id', type=int)
+    owner_id = args.get('owner_id', type=int)
+    status = args.get('status')
+    
+    if start_date:
+        query = query.filter(Booking.event_date >= datetime.strptime(start_date, '%Y-%m-%d').date())
+    if end_date:
+        query = query.filter(Booking.event_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+    if venue_id:
+        query = query.filter(Booking.venue_id == venue_id)
+    if owner_id:
+        query = query.join(Venue, Venue.id == Booking.venue_id).filter(Venue.owner_id == owner_id)
+    if status:
+        query = query.filter(Booking.booking_status == BookingStatus(status))
+    
+    return query
+
+@booking_bp.route('/export/bookings', methods=['GET'])
+def export_bookings():
+    """Stream bookings as NDJSON or CSV"""
+    try:
+        fmt = export_format(request.args)
+        columns = export_columns(request.args, BOOKING_EXPORT_COLUMNS, list(BOOKING_EXPORT_COLUMNS))
+        
+        query = db.session.query(*[BOOKING_EXPORT_COLUMNS[column] for column in columns]).select_from(Booking)
+        query = filter_export_query(query, request.args)
+        
+        return export_response(query.order_by(Booking.event_date, Booking.id), columns, fmt, 'bookings')
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@booking_bp.route('/export/payments', methods=['GET'])
+def export_payments():
+    """Stream payments with their booking's reference and date as NDJSON or CSV"""
+    try:
+        fmt = export_format(request.args)
+        columns = export_columns(request.args, PAYMENT_EXPORT_COLUMNS, list(PAYMENT_EXPORT_COLUMNS))
+        
+        query = db.session.query(*[PAYMENT_EXPORT_COLUMNS[column] for column in columns]).select_from(Payment).join(
+            Booking, Booking.id == Payment.booking_id
+        )
+        query = filter_export_query(query, request.args)
+        
+        payment_status = request.args.get('payment_status')
+        if payment_status:
+            query = query.filter(Payment.payment_status == PaymentStatus(payment_status))
+        
+        return export_response(query.order_by(Booking.event_date, Payment.id), columns, fmt, 'payments')
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @booking_bp.route('/stats/venue/<int:venue_id>', methods=['GET'])
 def get_venue_booking_stats(venue_id):
     """Get booking statistics for venue"""
     try:
         venue = Venue.query.get_or_404(venue_id)
         
-        # Get booking counts by status
-        stats = {
-            'total_bookings': Booking.query.filter_by(venue_id=venue_id).count(),
-            'pending_bookings': Booking.query.filter_by(
-                venue_id=venue_id, 
-                booking_status=BookingStatus.PENDING
-            ).count(),
-            'confirmed_bookings': Booking.query.filter_by(
-                venue_id=venue_id, 
-                booking_status=BookingStatus.CONFIRMED
-            ).count(),
-            'completed_bookings': Booking.query.filter_by(
-                venue_id=venue_id, 
-                booking_status=BookingStatus.COMPLETED
-            ).count(),
-            'cancelled_bookings': Booking.query.filter_by(
-                venue_id=venue_id, 
-                booking_status=BookingStatus.CANCELLED
-            ).count()
-        }
-        
-        # Calculate revenue
-        completed_bookings = Booking.query.filter_by(
-            venue_id=venue_id, 
-            booking_status=BookingStatus.COMPLETED,
-            payment_status=PaymentStatus.PAID
-        ).all()
-        
-        stats['total_revenue'] = sum(booking.total_amount for booking in completed_bookings)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        bucket = request.args.get('bucket')  # day, week, month
+        
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        
+        if bucket and bucket not in STATS_BUCKET_FORMATS:
+            return jsonify({'error': 'bucket must be one of day, week, month'}), 400
+        
+        if bucket and not (start_date and end_date):
+            return jsonify({'error': 'start_date and end_date are required for bucketed stats'}), 400
+        
+        # All counts, revenue and occupancy come from one grouped scan
+        columns = [
+            func.count(Booking.id).label('total_bookings'),
+            _status_count(BookingStatus.PENDING).label('pending_bookings'),
+            _status_count(BookingStatus.CONFIRMED).label('confirmed_bookings'),
+            _status_count(BookingStatus.COMPLETED).label('completed_bookings'),
+            _status_count(BookingStatus.CANCELLED).label('cancelled_bookings'),
+            func.sum(case(
+                (and_(Booking.booking_status == BookingStatus.COMPLETED,
+                      Booking.payment_status == PaymentStatus.PAID), Booking.total_amount),
+                else_=0
+            )).label('total_revenue'),
+            func.count(func.distinct(case(
+                (Booking.booking_status.in_([BookingStatus.CONFIRMED, BookingStatus.COMPLETED]), Booking.event_date)
+            ))).label('occupied_days')
+        ]
+        
+        if bucket:
+            bucket_column = func.strftime(STATS_BUCKET_FORMATS[bucket], Booking.event_date).label('bucket')
+            query = db.session.query(bucket_column, *columns).group_by(bucket_column).order_by(bucket_column)
+        else:
+            query = db.session.query(*columns)
+        
+        query = query.filter(Booking.venue_id == venue_id)
+        if start_date:
+            query = query.filter(Booking.event_date >= start_date)
+        if end_date:
+            query = query.filter(Booking.event_date <= end_date)
+        
+        rows = [_stats_row(row) for row in query.all()]
+        
+        stats = {key: 0 for key in STATS_KEYS}
+        for row in rows:
+            for key in STATS_KEYS:
+                stats[key] += row[key]
+        
+        if start_date and end_date:
+            days = (end_date - start_date).days + 1
+            stats['occupancy_rate'] = round(stats['occupied_days'] / days, 4) if days > 0 else 0
+        
+        if bucket:
+            # Count calendar days per bucket within the range to turn occupied days into a rate
+            days_per_bucket = {}
+            current_date = start_date
+            while current_date <= end_date:
+                label = current_date.strftime(STATS_BUCKET_FORMATS[bucket])
+                days_per_bucket[label] = days_per_bucket.get(label, 0) + 1
+                current_date += timedelta(days=1)
+            
+            rows_by_bucket = {row['bucket']: row for row in rows}
+            stats['buckets'] = []
+            for label, days in days_per_bucket.items():
+                row = rows_by_bucket.get(label, {key: 0 for key in STATS_KEYS})
+                bucket_stats = {'bucket': label, 'days': days}
+                bucket_stats.update({key: row[key] for key in STATS_KEYS})
+                bucket_stats['occupancy_rate'] = round(row['occupied_days'] / days, 4)
+                stats['buckets'].append(bucket_stats)
         
         return jsonify(stats), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@booking_bp.route('/stats/owner/<int:owner_id>', methods=['GET'])
+def get_owner_booking_stats(owner_id):
+    """Get booking statistics across all of an owner's venues from the daily rollups"""
+    try:
+        owner = User.query.get_or_404(owner_id)
+        if not owner.is_venue_owner():
+            return jsonify({'error': 'User is not a venue owner'}), 400
+        
+        try:
+            start_date = request.args.get('start_date')
+            end_date = request.args.get('end_date')
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        
+        query = db.session.query(
+            VenueDailyRollup.venue_id,
+            *[func.sum(getattr(VenueDailyRollup, column)).label(column) for column in OWNER_STATS_COLUMNS]
+        ).filter(VenueDailyRollup.owner_id == owner_id)
+        
+        if start_date:
+            query = query.filter(VenueDailyRollup.day >= start_date)
+        if end_date:
+            query = query.filter(VenueDailyRollup.day <= end_date)
+        
+        venues = []
+        totals = {column: 0 for column in OWNER_STATS_COLUMNS}
+        for row in query.group_by(VenueDailyRollup.venue_id).all():
+            venue_stats = {'venue_id': row.venue_id}
+            for column in OWNER_STATS_COLUMNS:
+                venue_stats[column] = getattr(row, column) or 0
+                totals[column] += venue_stats[column]
+            venues.append(venue_stats)
+        
+        return jsonify({
+            'owner_id': owner_id,
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'totals': totals,
+            'venues': venues
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _status_count(status):
+    return func.sum(case((Booking.booking_status == status, 1), else_=0))
+
+def _stats_row(row):
+    """Convert an aggregate row to a dict, turning NULL sums into zeros"""
+    data = {key: getattr(row, key) or 0 for key in STATS_KEYS}
+    if 'bucket' in row._fields:
+        data['bucket'] = row.bucket
+    return data
@@ -0,0 +1,207 @@
+"""Bulk booking import.
+
+Rows are validated against customers and venues fetched with one ``IN``
+query each and against the event type reference cache, then inserted in
+chunks. Every chunk runs under the reservation locks of the venue days it
+touches and checks its rows against one ``VenueSchedule`` per venue, adding
+accepted rows to the in-memory interval indexes so conflicts inside the
+batch are caught without further queries. A chunk that fails is rolled back
+and its rows are reported as errors; later chunks still run.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import time
+from src.models.user import User, db
+from src.models.venue import Venue
+from src.routes.conflicts import VenueSchedule
+from src.routes.availability_bitmap import mark_booked
+from src.routes.rollups import record_new_bookings
+from src.routes.holds import overlapping_holds
+from src.routes.reference_cache import event_type_cache
+from src.routes.reservation import venue_date_lock, with_reservation_retry
+from src.routes.booking_rules import (
+    UNAVAILABLE_MESSAGES, build_booking, calculate_booking_price, missing_booking_field, parse_booking_slot,
+    slot_error
+)
+
+IMPORT_CHUNK_SIZE = 500
+MAX_IMPORT_ROWS = 10000
+
+INTEGER_FIELDS = ['customer_id', 'venue_id', 'event_type_id', 'guest_count']
+FLOAT_FIELDS = ['additional_charges', 'discount']
+
+
+def import_format(mimetype, filename=None):
+    """Guess 'csv', 'jsonl' or 'json' from a MIME type or file name"""
+    name = (filename or '').lower()
+    mimetype = (mimetype or '').lower()
+    if 'csv' in mimetype or name.endswith('.csv'):
+        return 'csv'
+    if 'ndjson' in mimetype or 'jsonl' in mimetype or 'json-lines' in mimetype or name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'json'
+
+
+def parse_import_rows(text, fmt):
+    """Decode a CSV, JSON lines or JSON (array or {'bookings': [...]}) payload into rows"""
+    text = text.lstrip('\ufeff')
+    if fmt == 'csv':
+        return [
+            {key: value for key, value in row.items() if key is not None}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
+    if fmt == 'jsonl':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    payload = json.loads(text)
+    if isinstance(payload, dict):
+        payload = payload.get('bookings', [])
+    if not isinstance(payload, list):
+        raise ValueError('Expected a list of bookings')
+    return payload
+
+
+def _coerce_row(row):
+    # CSV cells arrive as strings and empty cells mean "not given"
+    data = {key: value for key, value in row.items() if value not in ('', None)}
+    for field in INTEGER_FIELDS:
+        if field in data:
+            data[field] = int(data[field])
+    for field in FLOAT_FIELDS:
+        if field in data:
+            data[field] = float(data[field])
+    return data
+
+
+def _error(position, message, reason=None):
+    result = {'row': position + 1, 'status': 'error', 'error': message}
+    if reason:
+        result['reason'] = reason
+    return result
+
+
+def _validate_rows(rows):
+    """Return (candidates, venues, errors) after prefetching every referenced record"""
+    errors = {}
+    parsed = []
+    for position, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[position] = _error(position, 'Row must be an object')
+            continue
+        try:
+            data = _coerce_row(row)
+        except (TypeError, ValueError):
+            errors[position] = _error(position, 'Invalid numeric value')
+            continue
+
+        missing_field = missing_booking_field(data)
+        if missing_field:
+            errors[position] = _error(position, f'{missing_field} is required')
+            continue
+
+        try:
+            event_date, start_time, end_time = parse_booking_slot(data)
+        except ValueError as e:
+            errors[position] = _error(position, str(e))
+            continue
+
+        error = slot_error(event_date, start_time, end_time)
+        if error:
+            errors[position] = _error(position, error)
+            continue
+
+        parsed.append((position, data, event_date, start_time, end_time))
+
+    customer_ids = {item[1]['customer_id'] for item in parsed}
+    venue_ids = {item[1]['venue_id'] for item in parsed}
+
+    customers = {row.id for row in db.session.query(User.id).filter(User.id.in_(customer_ids))} if customer_ids else set()
+    venues = {venue.id: venue for venue in Venue.query.filter(Venue.id.in_(venue_ids))} if venue_ids else {}
+
+    candidates = []
+    for position, data, event_date, start_time, end_time in parsed:
+        venue = venues.get(data['venue_id'])
+        if data['customer_id'] not in customers:
+            errors[position] = _error(position, 'Customer not found')
+        elif not venue or not venue.is_active:
+            errors[position] = _error(position, 'Venue not found or inactive')
+        elif not event_type_cache.get(data['event_type_id']):
+            errors[position] = _error(position, 'Event type not found')
+        elif data['guest_count'] > venue.capacity:
+            errors[position] = _error(position, f'Guest count exceeds venue capacity ({venue.capacity})')
+        else:
+            try:
+                calculate_booking_price(venue, start_time, end_time)
+            except ValueError as e:
+                errors[position] = _error(position, str(e))
+                continue
+            candidates.append((position, data, event_date, start_time, end_time))
+
+    return candidates, venues, errors
+
+
+def _insert_chunk(chunk, venues):
+    keys = {(data['venue_id'], event_date) for _, data, event_date, _, _ in chunk}
+    dates_by_venue = defaultdict(set)
+    for venue_id, event_date in keys:
+        dates_by_venue[venue_id].add(event_date)
+
+    with venue_date_lock(*keys):
+        schedules = {venue_id: VenueSchedule(venue_id, dates) for venue_id, dates in dates_by_venue.items()}
+        holds = {key: overlapping_holds(key[0], key[1], time.min, time.max) for key in keys}
+
+        results = {}
+        created = []
+        for position, data, event_date, start_time, end_time in chunk:
+            schedule = schedules[data['venue_id']]
+            availability = schedule.check(event_date, start_time, end_time)
+            if availability['available'] and any(
+                hold['start_time'] < end_time and hold['end_time'] > start_time
+                for hold in holds[(data['venue_id'], event_date)]
+            ):
+                availability = {'available': False, 'reason': 'held'}
+
+            if not availability['available']:
+                reason = availability['reason']
+                results[position] = _error(position, UNAVAILABLE_MESSAGES.get(reason, 'Venue is not available'), reason)
+                continue
+
+            booking = build_booking(data, venues[data['venue_id']], event_date, start_time, end_time)
+            db.session.add(booking)
+            schedule.index_for(event_date).add(start_time, end_time, 'booking', booking)
+            created.append((position, booking))
+
+        db.session.flush()
+        for position, booking in created:
+            mark_booked(booking.venue_id, booking.event_date, booking.start_time, booking.end_time)
+            results[position] = {
+                'row': position + 1,
+                'status': 'created',
+                'booking_id': booking.id,
+                'booking_reference': booking.booking_reference
+            }
+        record_new_bookings([booking for _, booking in created])
+        db.session.commit()
+
+    return results
+
+
+def import_bookings(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate and insert many bookings; returns one result dict per input row, in order"""
+    candidates, venues, results = _validate_rows(rows)
+
+    # Keep each venue day together so chunks lock as few days as possible; file order wins conflicts
+    candidates.sort(key=lambda item: (item[1]['venue_id'], item[2], item[0]))
+    for offset in range(0, len(candidates), chunk_size):
+        chunk = candidates[offset:offset + chunk_size]
+        try:
+            results.update(with_reservation_retry(lambda: _insert_chunk(chunk, venues)))
+        except Exception as e:
+            # A failed chunk is rolled back as a whole; report its rows and carry on with the next
+            db.session.rollback()
+            for position, *_ in chunk:
+                results[position] = _error(position, str(e))
+
+    return [results[position] for position in range(len(rows))]
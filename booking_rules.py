@@ -0,0 +1,122 @@
+"""Validation and pricing rules shared by single and bulk booking creation."""
+from datetime import datetime, date
+from src.models.booking import Booking, BookingStatus, PaymentStatus
+from src.routes.conflicts import serialize_conflicts
+import uuid
+
+REQUIRED_BOOKING_FIELDS = ['customer_id', 'venue_id', 'event_type_id',
+                           'event_date', 'start_time', 'end_time', 'guest_count']
+
+UNAVAILABLE_MESSAGES = {
+    'blocked': 'Venue is blocked on this date',
+    'closed': 'Venue is closed on this day',
+    'outside_hours': 'Requested time is outside operating hours',
+    'conflict': 'Time slot conflicts with an existing booking',
+    'held': 'Time slot is currently held by another customer'
+}
+
+
+def generate_booking_reference():
+    """Generate unique booking reference"""
+    return f"YQ{datetime.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:6].upper()}"
+
+
+def missing_booking_field(data):
+    """Name of the first required field missing from a booking payload, if any"""
+    for field in REQUIRED_BOOKING_FIELDS:
+        if not data.get(field):
+            return field
+    return None
+
+
+def parse_booking_slot(data):
+    """Parse event_date, start_time and end_time; raises ValueError on bad formats"""
+    try:
+        event_date = datetime.strptime(data['event_date'], '%Y-%m-%d').date()
+        start_time = datetime.strptime(data['start_time'], '%H:%M').time()
+        end_time = datetime.strptime(data['end_time'], '%H:%M').time()
+    except (TypeError, ValueError):
+        raise ValueError('Invalid date or time format')
+    return event_date, start_time, end_time
+
+
+def slot_error(event_date, start_time, end_time):
+    """Reason a requested slot can never be booked, or None"""
+    if event_date <= date.today():
+        return 'Event date must be in the future'
+    if end_time <= start_time:
+        return 'End time must be after start time'
+    return None
+
+
+def unavailable_details(availability):
+    """Error body for a slot the conflict engine or a hold rejected: reason and what is in the way"""
+    reason = availability['reason']
+    details = {
+        'error': UNAVAILABLE_MESSAGES.get(reason, 'Venue is not available for the selected time slot'),
+        'reason': reason
+    }
+    if reason == 'blocked':
+        details['blocked_reason'] = availability['blocked'].reason
+    elif reason == 'outside_hours':
+        operating_hours = availability['operating_hours']
+        details['operating_hours'] = {
+            'open': operating_hours.open_time.strftime('%H:%M'),
+            'close': operating_hours.close_time.strftime('%H:%M')
+        }
+    elif reason == 'conflict':
+        details.update(serialize_conflicts(availability))
+    elif reason == 'held':
+        # Hold tokens and customers stay private; only the held intervals are shown
+        details['held_slots'] = [
+            {
+                'start_time': hold['start_time'].strftime('%H:%M'),
+                'end_time': hold['end_time'].strftime('%H:%M'),
+                'expires_at': hold['expires_at'].isoformat()
+            }
+            for hold in availability.get('holds', [])
+        ]
+    return details
+
+
+def calculate_booking_price(venue, start_time, end_time, additional_charges=0.0, discount=0.0):
+    """Return (base_price, total_amount); raises ValueError if the venue has no pricing"""
+    duration_hours = (datetime.combine(date.today(), end_time) -
+                      datetime.combine(date.today(), start_time)).total_seconds() / 3600
+
+    if venue.price_per_hour:
+        base_price = venue.price_per_hour * duration_hours
+    elif venue.price_per_day:
+        base_price = venue.price_per_day
+    else:
+        raise ValueError('Venue pricing not configured')
+
+    return base_price, base_price + additional_charges - discount
+
+
+def build_booking(data, venue, event_date, start_time, end_time):
+    """Create an unsaved pending Booking from a validated payload"""
+    additional_charges = data.get('additional_charges', 0.0)
+    discount = data.get('discount', 0.0)
+    base_price, total_amount = calculate_booking_price(venue, start_time, end_time, additional_charges, discount)
+
+    return Booking(
+        booking_reference=generate_booking_reference(),
+        customer_id=data['customer_id'],
+        venue_id=data['venue_id'],
+        event_type_id=data['event_type_id'],
+        event_date=event_date,
+        start_time=start_time,
+        end_time=end_time,
+        guest_count=data['guest_count'],
+        event_title_en=data.get('event_title_en'),
+        event_title_ar=data.get('event_title_ar'),
+        special_requirements_en=data.get('special_requirements_en'),
+        special_requirements_ar=data.get('special_requirements_ar'),
+        base_price=base_price,
+        additional_charges=additional_charges,
+        discount=discount,
+        total_amount=total_amount,
+        booking_status=BookingStatus.PENDING,
+        payment_status=PaymentStatus.PENDING
+    )
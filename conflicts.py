@@ -0,0 +1,241 @@
+"""Booking conflict engine shared by the booking and availability routes.
+
+Every (venue, date) pair gets a sorted interval index built from the active
+bookings and the booked/maintenance availability slots of that day. Intervals
+are half-open ``[start, end)`` so back-to-back events never collide.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from sqlalchemy import and_, or_, exists
+from src.models.availability import VenueAvailability, VenueBlockedDates, VenueOperatingHours, AvailabilityStatus
+from src.models.booking import Booking, BookingStatus
+from src.models.venue import Venue
+
+# Booking states that hold a slot
+ACTIVE_BOOKING_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
+
+# Availability slot states that hold a slot
+BLOCKING_SLOT_STATUSES = [AvailabilityStatus.BOOKED, AvailabilityStatus.MAINTENANCE]
+
+
+class DayIntervalIndex:
+    """Sorted interval index for a single venue and date"""
+
+    def __init__(self, entries=None):
+        # Each entry is (start_time, end_time, source, record)
+        self._entries = sorted(entries or [], key=lambda entry: (entry[0], entry[1]))
+        self._rebuild()
+
+    def _rebuild(self):
+        self._starts = [entry[0] for entry in self._entries]
+        # Running maximum of end times lets a single bisect answer "any overlap?"
+        self._max_ends = []
+        running = None
+        for entry in self._entries:
+            running = entry[1] if running is None or entry[1] > running else running
+            self._max_ends.append(running)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, start_time, end_time, source, record=None):
+        """Insert an interval, keeping the index sorted"""
+        insort(self._entries, (start_time, end_time, source, record), key=lambda entry: (entry[0], entry[1]))
+        self._rebuild()
+
+    def has_conflict(self, start_time, end_time):
+        """Return True if any interval overlaps [start_time, end_time) in O(log n)"""
+        candidates = bisect_left(self._starts, end_time)
+        return candidates > 0 and self._max_ends[candidates - 1] > start_time
+
+    def find_conflicts(self, start_time, end_time):
+        """Return the (start, end, source, record) entries overlapping [start_time, end_time)"""
+        if not self.has_conflict(start_time, end_time):
+            return []
+        candidates = bisect_left(self._starts, end_time)
+        return [entry for entry in self._entries[:candidates] if entry[1] > start_time]
+
+
+def load_day_indexes(venue_id, dates, exclude_booking_id=None):
+    """Build interval indexes for a venue over a set of dates (two queries total)"""
+    dates = set(dates)
+    indexes = {day: DayIntervalIndex() for day in dates}
+    if not dates:
+        return indexes
+
+    entries = defaultdict(list)
+
+    booking_query = Booking.query.filter(
+        and_(
+            Booking.venue_id == venue_id,
+            Booking.event_date.in_(dates),
+            Booking.booking_status.in_(ACTIVE_BOOKING_STATUSES)
+        )
+    )
+    if exclude_booking_id:
+        booking_query = booking_query.filter(Booking.id != exclude_booking_id)
+
+    for booking in booking_query.all():
+        entries[booking.event_date].append((booking.start_time, booking.end_time, 'booking', booking))
+
+    slots = VenueAvailability.query.filter(
+        and_(
+            VenueAvailability.venue_id == venue_id,
+            VenueAvailability.date.in_(dates),
+            VenueAvailability.status.in_(BLOCKING_SLOT_STATUSES)
+        )
+    ).all()
+
+    for slot in slots:
+        entries[slot.date].append((slot.start_time, slot.end_time, 'slot', slot))
+
+    for day, day_entries in entries.items():
+        indexes[day] = DayIntervalIndex(day_entries)
+
+    return indexes
+
+
+class VenueSchedule:
+    """Blocked dates, operating hours and interval indexes for one venue"""
+
+    def __init__(self, venue_id, dates, exclude_booking_id=None):
+        self.venue_id = venue_id
+        dates = set(dates)
+
+        self.blocked_dates = []
+        if dates:
+            self.blocked_dates = VenueBlockedDates.query.filter(
+                and_(
+                    VenueBlockedDates.venue_id == venue_id,
+                    VenueBlockedDates.start_date <= max(dates),
+                    VenueBlockedDates.end_date >= min(dates)
+                )
+            ).order_by(VenueBlockedDates.start_date).all()
+
+        self.operating_hours = {
+            hours.day_of_week: hours
+            for hours in VenueOperatingHours.query.filter_by(venue_id=venue_id).all()
+        }
+
+        self.indexes = load_day_indexes(venue_id, dates, exclude_booking_id=exclude_booking_id)
+
+    def blocked_entry(self, check_date):
+        """Return the blocked-date entry covering a date, if any"""
+        for blocked in self.blocked_dates:
+            if blocked.start_date > check_date:
+                break
+            if blocked.end_date >= check_date:
+                return blocked
+        return None
+
+    def index_for(self, check_date):
+        if check_date not in self.indexes:
+            self.indexes.update(load_day_indexes(self.venue_id, [check_date]))
+        return self.indexes[check_date]
+
+    def check(self, check_date, start_time, end_time):
+        """Check a single candidate slot and describe why it is unavailable"""
+        blocked = self.blocked_entry(check_date)
+        if blocked:
+            return {
+                'available': False,
+                'reason': 'blocked',
+                'blocked': blocked
+            }
+
+        operating_hours = self.operating_hours.get(check_date.weekday())
+        if operating_hours and operating_hours.is_closed:
+            return {
+                'available': False,
+                'reason': 'closed'
+            }
+
+        if operating_hours and operating_hours.open_time and operating_hours.close_time:
+            if start_time < operating_hours.open_time or end_time > operating_hours.close_time:
+                return {
+                    'available': False,
+                    'reason': 'outside_hours',
+                    'operating_hours': operating_hours
+                }
+
+        conflicts = self.index_for(check_date).find_conflicts(start_time, end_time)
+        if conflicts:
+            return {
+                'available': False,
+                'reason': 'conflict',
+                'conflicting_bookings': [entry[3] for entry in conflicts if entry[2] == 'booking'],
+                'conflicting_slots': [entry[3] for entry in conflicts if entry[2] == 'slot']
+            }
+
+        return {'available': True, 'reason': None}
+
+
+def check_slot(venue_id, check_date, start_time, end_time, exclude_booking_id=None):
+    """Check a single candidate slot for a venue"""
+    schedule = VenueSchedule(venue_id, [check_date], exclude_booking_id=exclude_booking_id)
+    return schedule.check(check_date, start_time, end_time)
+
+
+def check_slots(venue_id, slots):
+    """Check many (date, start_time, end_time) candidates for a venue in one pass"""
+    schedule = VenueSchedule(venue_id, [slot[0] for slot in slots])
+    return [schedule.check(*slot) for slot in slots]
+
+
+def serialize_conflicts(result):
+    """JSON-friendly view of the records that caused a conflict"""
+    return {
+        'conflicting_slots': [slot.to_dict() for slot in result.get('conflicting_slots', [])],
+        'conflicting_bookings': [
+            {
+                'booking_id': booking.id,
+                'start_time': booking.start_time.strftime('%H:%M'),
+                'end_time': booking.end_time.strftime('%H:%M'),
+                'status': booking.booking_status.value
+            }
+            for booking in result.get('conflicting_bookings', [])
+        ]
+    }
+
+
+def venue_available_clause(check_date, start_time=None, end_time=None):
+    """SQL criterion matching venues free on a date (and optionally a time range)
+
+    Mirrors ``VenueSchedule.check`` as correlated NOT EXISTS subqueries so a
+    venue listing can be filtered in a single statement. Without a time range
+    a venue only matches if nothing is booked that day.
+    """
+    booking_overlap = [
+        Booking.venue_id == Venue.id,
+        Booking.event_date == check_date,
+        Booking.booking_status.in_(ACTIVE_BOOKING_STATUSES)
+    ]
+    slot_overlap = [
+        VenueAvailability.venue_id == Venue.id,
+        VenueAvailability.date == check_date,
+        VenueAvailability.status.in_(BLOCKING_SLOT_STATUSES)
+    ]
+    hours_conflict = [VenueOperatingHours.is_closed == True]
+
+    if start_time and end_time:
+        booking_overlap += [Booking.start_time < end_time, Booking.end_time > start_time]
+        slot_overlap += [VenueAvailability.start_time < end_time, VenueAvailability.end_time > start_time]
+        hours_conflict += [
+            and_(VenueOperatingHours.open_time != None, VenueOperatingHours.open_time > start_time),
+            and_(VenueOperatingHours.close_time != None, VenueOperatingHours.close_time < end_time)
+        ]
+
+    return and_(
+        ~exists().where(and_(
+            VenueBlockedDates.venue_id == Venue.id,
+            VenueBlockedDates.start_date <= check_date,
+            VenueBlockedDates.end_date >= check_date
+        )),
+        ~exists().where(and_(
+            VenueOperatingHours.venue_id == Venue.id,
+            VenueOperatingHours.day_of_week == check_date.weekday(),
+            or_(*hours_conflict)
+        )),
+        ~exists().where(and_(*booking_overlap)),
+        ~exists().where(and_(*slot_overlap))
+    )
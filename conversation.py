@@ -0,0 +1,127 @@
+"""Materialized conversation summaries for the messaging inbox.
+
+Each participant of a conversation owns one ``Conversation`` row pointing at
+the latest message and counting the messages they have not read yet. The
+message routes update these rows in the same transaction as the messages
+themselves, so the inbox is a single indexed range read on
+``(user_id, last_message_at)``.
+"""
+from datetime import datetime
+from sqlalchemy import and_, case, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models.user import User, db
+from src.models.message import Message, MessageStatus
+
+
+class Conversation(db.Model):
+    __tablename__ = 'conversations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id), nullable=False)
+    partner_id = db.Column(db.Integer, db.ForeignKey(User.id), nullable=False)
+    last_message_id = db.Column(db.Integer, db.ForeignKey(Message.id))
+    last_message_at = db.Column(db.DateTime)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'partner_id', name='uq_conversations_user_partner'),
+        db.Index('ix_conversations_user_last_message', 'user_id', 'last_message_at'),
+    )
+
+
+def _touch(user_id, partner_id, message, unread_delta):
+    # One upsert, so the first messages of a new pair can arrive concurrently
+    statement = sqlite_insert(Conversation).values(
+        user_id=user_id,
+        partner_id=partner_id,
+        last_message_id=message.id,
+        last_message_at=message.created_at,
+        unread_count=unread_delta
+    )
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[Conversation.user_id, Conversation.partner_id],
+            set_={
+                'last_message_id': statement.excluded.last_message_id,
+                'last_message_at': statement.excluded.last_message_at,
+                'unread_count': Conversation.unread_count + unread_delta
+            }
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def record_message(message):
+    """Move both sides of a conversation to a newly flushed message (caller commits)"""
+    _touch(message.sender_id, message.receiver_id, message, 0)
+    _touch(message.receiver_id, message.sender_id, message, 1)
+
+
+def mark_read(user_id, partner_id, count=None):
+    """Lower the reader's unread counter by count, or clear it when count is None (caller commits)"""
+    if count is None:
+        unread_count = 0
+    else:
+        unread_count = case(
+            (Conversation.unread_count > count, Conversation.unread_count - count),
+            else_=0
+        )
+
+    db.session.execute(
+        update(Conversation).where(and_(
+            Conversation.user_id == user_id,
+            Conversation.partner_id == partner_id
+        )).values(unread_count=unread_count).execution_options(synchronize_session=False)
+    )
+
+
+def mark_conversation_read(reader_id, partner_id, up_to_message_id=None):
+    """Mark the partner's messages to the reader as read with one UPDATE (caller commits)
+
+    With ``up_to_message_id`` only messages up to and including that id are
+    marked, so a client can acknowledge exactly what it has displayed.
+    Returns the number of messages that changed state.
+    """
+    criteria = [
+        Message.sender_id == partner_id,
+        Message.receiver_id == reader_id,
+        Message.status != MessageStatus.READ
+    ]
+    if up_to_message_id is not None:
+        criteria.append(Message.id <= up_to_message_id)
+
+    result = db.session.execute(
+        update(Message).where(and_(*criteria)).values(
+            status=MessageStatus.READ,
+            read_at=datetime.utcnow()
+        ).execution_options(synchronize_session='evaluate')
+    )
+
+    if up_to_message_id is None:
+        mark_read(reader_id, partner_id)
+    elif result.rowcount:
+        mark_read(reader_id, partner_id, result.rowcount)
+
+    return result.rowcount
+
+
+def rebuild_conversations():
+    """Recompute every conversation summary from the message history (caller commits)"""
+    summaries = {}
+    for message in Message.query.order_by(Message.created_at, Message.id).yield_per(1000):
+        for user_id, partner_id in {(message.sender_id, message.receiver_id), (message.receiver_id, message.sender_id)}:
+            summary = summaries.setdefault((user_id, partner_id), {
+                'user_id': user_id,
+                'partner_id': partner_id,
+                'unread_count': 0
+            })
+            summary['last_message_id'] = message.id
+            summary['last_message_at'] = message.created_at
+
+        if message.status != MessageStatus.READ:
+            summaries[(message.receiver_id, message.sender_id)]['unread_count'] += 1
+
+    Conversation.query.delete()
+    if summaries:
+        db.session.execute(insert(Conversation), list(summaries.values()))
+    return len(summaries)
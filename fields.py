@@ -0,0 +1,73 @@
+"""Sparse fieldsets for list endpoints (``?fields=id,name_ar,capacity``).
+
+Each endpoint passes an explicit allowlist of the fields it exposes; any other
+name is rejected with a ValueError. When every requested field is a mapped
+column, only those columns (plus the primary key and ``created_at``, used for
+ordering and cursors) are SELECTed with ``load_only`` and rows are projected
+directly. Allowed non-column fields fall back to ``to_dict`` with the
+response trimmed to the requested keys.
+"""
+from datetime import date, datetime, time
+from enum import Enum
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+# Columns always loaded so ordering and cursors don't lazy-load per row
+ALWAYS_LOADED = ['created_at']
+
+
+def requested_fields(args):
+    """Field names from the ``fields`` argument, or None when absent"""
+    raw = args.get('fields')
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    return fields or None
+
+
+def json_value(value):
+    """JSON-friendly form of a column value"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    return value
+
+
+def unknown_fields(fields, allowed):
+    """Raise ValueError naming any requested field that is not in ``allowed``"""
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+
+class FieldSet:
+    """Requested fields of one model and how to load and serialize them
+
+    ``allowed`` is the endpoint's allowlist; other fields raise ValueError.
+    """
+
+    def __init__(self, model, fields, allowed, required=()):
+        unknown_fields(fields, allowed)
+        self.model = model
+        self.fields = fields
+        columns = {attr.key for attr in inspect(model).column_attrs}
+        self.direct = all(field in columns for field in fields)
+        self.loaded = [
+            name for name in dict.fromkeys(list(fields) + ALWAYS_LOADED + list(required))
+            if name in columns or name in required
+        ]
+
+    def apply(self, query):
+        """Narrow the SELECTed columns when the fields can be projected directly"""
+        if not self.direct:
+            return query
+        return query.options(load_only(*[getattr(self.model, name) for name in self.loaded]))
+
+    def serialize(self, row, language='ar'):
+        if self.direct:
+            return {field: json_value(getattr(row, field)) for field in self.fields}
+        data = row.to_dict(language=language)
+        return {field: data[field] for field in self.fields if field in data}
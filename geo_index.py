@@ -0,0 +1,112 @@
+"""Spatial index for venue proximity search backed by an SQLite R*Tree.
+
+Venue coordinates are mirrored into an R*Tree so a "near me" search only
+touches venues inside the bounding box of the search circle. Exact haversine
+distances are then computed for that small candidate set. Without R*Tree
+support the bounding box is applied directly to the venue columns.
+"""
+from math import asin, cos, radians, sin, sqrt
+from sqlalchemy import and_, text
+from sqlalchemy.exc import OperationalError
+from src.models.user import db
+from src.models.venue import Venue
+
+GEO_TABLE = 'venue_geo'
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+_rtree_enabled = False
+
+
+def init_geo_index():
+    """Create the R*Tree table if possible and backfill it when empty"""
+    global _rtree_enabled
+
+    if db.engine.dialect.name != 'sqlite':
+        _rtree_enabled = False
+        return
+
+    try:
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {GEO_TABLE} "
+            f"USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+        ))
+    except OperationalError:
+        # SQLite was built without R*Tree
+        db.session.rollback()
+        _rtree_enabled = False
+        return
+
+    _rtree_enabled = True
+    if db.session.execute(text(f"SELECT count(*) FROM {GEO_TABLE}")).scalar() == 0:
+        for venue in Venue.query.filter(
+            and_(Venue.latitude != None, Venue.longitude != None)
+        ).yield_per(500):
+            index_venue_location(venue)
+    db.session.commit()
+
+
+def index_venue_location(venue):
+    """Insert, move or remove a venue's point in the spatial index (caller commits)"""
+    if not _rtree_enabled:
+        return
+
+    db.session.execute(text(f"DELETE FROM {GEO_TABLE} WHERE id = :venue_id"), {'venue_id': venue.id})
+    if venue.latitude is not None and venue.longitude is not None:
+        db.session.execute(text(
+            f"INSERT INTO {GEO_TABLE} (id, min_lat, max_lat, min_lng, max_lng) "
+            f"VALUES (:venue_id, :lat, :lat, :lng, :lng)"
+        ), {'venue_id': venue.id, 'lat': float(venue.latitude), 'lng': float(venue.longitude)})
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle of radius_km"""
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    lng_scale = KM_PER_DEGREE_LAT * cos(radians(lat))
+    lng_delta = radius_km / lng_scale if lng_scale > 1e-6 else 180.0
+    return (
+        max(lat - lat_delta, -90.0),
+        min(lat + lat_delta, 90.0),
+        max(lng - min(lng_delta, 180.0), -180.0),
+        min(lng + min(lng_delta, 180.0), 180.0)
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def filter_within_box(query, lat, lng, radius_km):
+    """Restrict a Venue query to the bounding box of a search circle"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+
+    if _rtree_enabled:
+        candidates = text(
+            f"SELECT id AS venue_id FROM {GEO_TABLE} "
+            f"WHERE max_lat >= :min_lat AND min_lat <= :max_lat "
+            f"AND max_lng >= :min_lng AND min_lng <= :max_lng"
+        ).bindparams(
+            min_lat=min_lat, max_lat=max_lat, min_lng=min_lng, max_lng=max_lng
+        ).columns(venue_id=db.Integer).subquery('venue_geo_candidates')
+        return query.join(candidates, candidates.c.venue_id == Venue.id)
+
+    return query.filter(and_(
+        Venue.latitude.between(min_lat, max_lat),
+        Venue.longitude.between(min_lng, max_lng)
+    ))
+
+
+def venues_within_radius(query, lat, lng, radius_km):
+    """Return [(venue, distance_km)] inside the circle, nearest first"""
+    results = []
+    for venue in filter_within_box(query, lat, lng, radius_km).all():
+        if venue.latitude is None or venue.longitude is None:
+            continue
+        distance = haversine_km(lat, lng, float(venue.latitude), float(venue.longitude))
+        if distance <= radius_km:
+            results.append((venue, distance))
+    results.sort(key=lambda result: result[1])
+    return results
@@ -0,0 +1,195 @@
+"""Short-lived slot holds for checkout.
+
+A hold reserves a venue time range for a few minutes and is identified by a
+token that ``create_booking`` consumes. Holds live in a process-local store
+by default; set ``SLOT_HOLD_BACKEND = 'database'`` to keep them in the
+``slot_holds`` table instead when several worker processes serve bookings.
+Expired holds are ignored on read and removed by a background sweeper.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_
+from src.models.user import User, db
+from src.models.venue import Venue
+
+DEFAULT_HOLD_MINUTES = 10
+MAX_HOLD_MINUTES = 30
+HOLD_SWEEP_SECONDS = 60
+
+_memory_holds = {}
+_memory_by_day = {}
+_memory_guard = threading.Lock()
+
+# Process that owns the running sweeper thread; a forked worker starts its own
+_sweeper_pid = None
+_sweeper_guard = threading.Lock()
+
+
+class SlotHold(db.Model):
+    __tablename__ = 'slot_holds'
+
+    token = db.Column(db.String(32), primary_key=True)
+    venue_id = db.Column(db.Integer, db.ForeignKey(Venue.id), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey(User.id))
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_slot_holds_venue_date', 'venue_id', 'date'),
+    )
+
+    def to_hold(self):
+        return {
+            'token': self.token,
+            'venue_id': self.venue_id,
+            'date': self.date,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'customer_id': self.customer_id,
+            'expires_at': self.expires_at
+        }
+
+
+def _use_database():
+    return current_app.config.get('SLOT_HOLD_BACKEND', 'memory') == 'database'
+
+
+def serialize_hold(hold):
+    """JSON-friendly view of a hold"""
+    return {
+        'token': hold['token'],
+        'venue_id': hold['venue_id'],
+        'date': hold['date'].isoformat(),
+        'start_time': hold['start_time'].strftime('%H:%M'),
+        'end_time': hold['end_time'].strftime('%H:%M'),
+        'customer_id': hold['customer_id'],
+        'expires_at': hold['expires_at'].isoformat()
+    }
+
+
+def add_hold(venue_id, day, start_time, end_time, customer_id=None, minutes=DEFAULT_HOLD_MINUTES):
+    """Store a new hold and return it (database backend: caller commits)
+
+    Callers are expected to have checked the slot under ``venue_date_lock``.
+    """
+    hold = {
+        'token': uuid.uuid4().hex,
+        'venue_id': venue_id,
+        'date': day,
+        'start_time': start_time,
+        'end_time': end_time,
+        'customer_id': customer_id,
+        'expires_at': datetime.utcnow() + timedelta(minutes=minutes)
+    }
+
+    if _use_database():
+        db.session.add(SlotHold(**hold))
+        db.session.flush()
+    else:
+        with _memory_guard:
+            _memory_holds[hold['token']] = hold
+            _memory_by_day.setdefault((venue_id, day), set()).add(hold['token'])
+    return hold
+
+
+def get_hold(token):
+    """Live hold for a token, or None if unknown or expired"""
+    if _use_database():
+        row = SlotHold.query.get(token)
+        hold = row.to_hold() if row else None
+    else:
+        hold = _memory_holds.get(token)
+
+    if hold is None or hold['expires_at'] <= datetime.utcnow():
+        return None
+    return hold
+
+
+def overlapping_holds(venue_id, day, start_time, end_time, exclude_token=None):
+    """Live holds on a venue and date that overlap the given time range"""
+    now = datetime.utcnow()
+    if _use_database():
+        rows = SlotHold.query.filter(and_(
+            SlotHold.venue_id == venue_id,
+            SlotHold.date == day,
+            SlotHold.start_time < end_time,
+            SlotHold.end_time > start_time,
+            SlotHold.expires_at > now
+        )).all()
+        holds = [row.to_hold() for row in rows]
+    else:
+        with _memory_guard:
+            tokens = _memory_by_day.get((venue_id, day), ())
+            holds = [
+                hold for hold in (_memory_holds[token] for token in tokens)
+                if hold['start_time'] < end_time and hold['end_time'] > start_time and hold['expires_at'] > now
+            ]
+    return [hold for hold in holds if hold['token'] != exclude_token]
+
+
+def release_hold(token):
+    """Drop a hold; returns True if it existed (database backend: caller commits)"""
+    if _use_database():
+        return SlotHold.query.filter_by(token=token).delete(synchronize_session=False) > 0
+
+    with _memory_guard:
+        hold = _memory_holds.pop(token, None)
+        if hold is None:
+            return False
+        key = (hold['venue_id'], hold['date'])
+        tokens = _memory_by_day.get(key)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del _memory_by_day[key]
+    return True
+
+
+def sweep_expired_holds():
+    """Remove expired holds from the active backend (database backend: caller commits)"""
+    now = datetime.utcnow()
+    if _use_database():
+        return SlotHold.query.filter(SlotHold.expires_at <= now).delete(synchronize_session=False)
+
+    with _memory_guard:
+        expired = [token for token, hold in _memory_holds.items() if hold['expires_at'] <= now]
+    for token in expired:
+        release_hold(token)
+    return len(expired)
+
+
+def start_hold_sweeper(app, interval=HOLD_SWEEP_SECONDS):
+    """Start a daemon thread that periodically removes expired holds
+
+    Safe to call whenever the app is created: at most one sweeper runs per
+    process, and worker processes forked afterwards (e.g. a preloading WSGI
+    server) start their own. Returns None when this process already has one.
+    """
+    global _sweeper_pid
+    with _sweeper_guard:
+        if _sweeper_pid == os.getpid():
+            return None
+        if _sweeper_pid is None:
+            os.register_at_fork(after_in_child=lambda: start_hold_sweeper(app, interval))
+        _sweeper_pid = os.getpid()
+
+    def sweep():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    sweep_expired_holds()
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+
+    thread = threading.Thread(target=sweep, name='slot-hold-sweeper', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,45 @@
+"""Conditional GET helpers for cacheable JSON responses."""
+from datetime import timezone
+from flask import current_app, jsonify, request
+
+
+def _as_utc(moment):
+    # Stored timestamps are naive UTC; HTTP dates have whole-second precision
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.replace(microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    """True if the request's validators show the client's copy is current
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return _as_utc(last_modified) <= request.if_modified_since
+    return False
+
+
+def conditional_response(body, etag, last_modified=None, mimetype='application/json'):
+    """Response for an already serialized body with validators, or 304 if the client's copy is current
+
+    Clients must revalidate on every use, which costs them nothing when the
+    validators still match.
+    """
+    if is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype=mimetype)
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional_json(payload, etag, last_modified=None):
+    """jsonify payload with validators, or answer 304 if the client's copy is current"""
+    return conditional_response(jsonify(payload).get_data(), etag, last_modified)
@@ -0,0 +1,142 @@
+"""In-memory featured-venue leaderboard.
+
+Active, verified venues are kept sorted by average rating and review count,
+globally and per governorate. Committed changes to a venue's rating, review
+count, verification, activity or governorate move it in place; the whole
+board is rebuilt from the database when its TTL expires so changes made by
+other processes are picked up.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from sqlalchemy import and_, event, inspect
+from sqlalchemy.orm import Session, object_session
+from src.models.venue import Venue
+
+LEADERBOARD_TTL = 300
+
+# Venue attributes that affect membership or order
+TRACKED_ATTRIBUTES = ['average_rating', 'total_reviews', 'is_active', 'is_verified', 'governorate_en', 'governorate_ar']
+
+
+def _governorate_keys(governorate_en, governorate_ar):
+    return {name.strip().lower() for name in (governorate_en, governorate_ar) if name and name.strip()}
+
+
+class Leaderboard:
+    """Sorted rankings of featured venues, global and per governorate"""
+
+    def __init__(self, ttl=LEADERBOARD_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._ranking = []
+        self._by_governorate = {}
+        self._members = {}
+
+    def _remove(self, venue_id):
+        member = self._members.pop(venue_id, None)
+        if member is None:
+            return
+        rank_key, governorates = member
+        for ranking in [self._ranking] + [self._by_governorate[key] for key in governorates]:
+            index = bisect_left(ranking, rank_key)
+            if index < len(ranking) and ranking[index] == rank_key:
+                del ranking[index]
+
+    def _add(self, snapshot):
+        venue_id, average_rating, total_reviews, is_active, is_verified, governorate_en, governorate_ar = snapshot
+        if not (is_active and is_verified):
+            return
+        rank_key = (-(average_rating or 0.0), -(total_reviews or 0), venue_id)
+        governorates = _governorate_keys(governorate_en, governorate_ar)
+        insort(self._ranking, rank_key)
+        for key in governorates:
+            insort(self._by_governorate.setdefault(key, []), rank_key)
+        self._members[venue_id] = (rank_key, governorates)
+
+    def rebuild(self):
+        rows = Venue.query.with_entities(
+            Venue.id, Venue.average_rating, Venue.total_reviews, Venue.is_active,
+            Venue.is_verified, Venue.governorate_en, Venue.governorate_ar
+        ).filter(and_(Venue.is_active == True, Venue.is_verified == True)).all()
+
+        with self._lock:
+            self._ranking = []
+            self._by_governorate = {}
+            self._members = {}
+            for row in rows:
+                self._add(tuple(row))
+            self._loaded_at = time.monotonic()
+
+    def apply(self, venue_id, snapshot):
+        """Move, add or drop one venue; snapshot is None for a deleted venue"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(venue_id)
+            if snapshot is not None:
+                self._add(snapshot)
+
+    def top(self, limit, governorate=None):
+        """Ids of the best-ranked venues, optionally within a governorate"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            self.rebuild()
+
+        with self._lock:
+            if governorate:
+                ranking = self._by_governorate.get(governorate.strip().lower(), [])
+            else:
+                ranking = self._ranking
+            return [rank_key[2] for rank_key in ranking[:limit]]
+
+
+featured_leaderboard = Leaderboard()
+
+
+def featured_venues(limit, governorate=None):
+    """Top featured Venue rows in leaderboard order (one query)"""
+    venue_ids = featured_leaderboard.top(limit, governorate)
+    if not venue_ids:
+        return []
+    venues = {venue.id: venue for venue in Venue.query.filter(Venue.id.in_(venue_ids)).all()}
+    return [venues[venue_id] for venue_id in venue_ids if venue_id in venues]
+
+
+def _snapshot(venue):
+    return (venue.id, venue.average_rating, venue.total_reviews, venue.is_active,
+            venue.is_verified, venue.governorate_en, venue.governorate_ar)
+
+
+def _queue(target, snapshot):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('leaderboard_changes', {})[target.id] = snapshot
+
+
+@event.listens_for(Venue, 'after_insert')
+def _venue_inserted(mapper, connection, target):
+    _queue(target, _snapshot(target))
+
+
+@event.listens_for(Venue, 'after_update')
+def _venue_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in TRACKED_ATTRIBUTES):
+        _queue(target, _snapshot(target))
+
+
+@event.listens_for(Venue, 'after_delete')
+def _venue_deleted(mapper, connection, target):
+    _queue(target, None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed(session):
+    for venue_id, snapshot in session.info.pop('leaderboard_changes', {}).items():
+        featured_leaderboard.apply(venue_id, snapshot)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop('leaderboard_changes', None)
@@ -0,0 +1,107 @@
+"""Cached paid-amount ledger for bookings.
+
+``BookingLedger`` keeps the sum of a booking's paid payments so payment
+routes do not have to load every payment row. The amount is changed with an
+SQL increment in the same transaction as the payment state change, and
+``reconcile_ledgers`` checks it against the ``Payment`` rows.
+"""
+from datetime import datetime
+from sqlalchemy import func, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models.user import db
+from src.models.booking import Booking, Payment, PaymentStatus
+
+# Ledger and payment totals closer than this are considered equal
+TOLERANCE = 0.005
+
+
+class BookingLedger(db.Model):
+    __tablename__ = 'booking_ledgers'
+
+    booking_id = db.Column(db.Integer, db.ForeignKey(Booking.id), primary_key=True)
+    amount_paid = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def _paid_total(booking_id, exclude_payment_id=None):
+    query = db.session.query(func.coalesce(func.sum(Payment.amount), 0.0)).filter(
+        Payment.booking_id == booking_id,
+        Payment.payment_status == PaymentStatus.PAID
+    )
+    if exclude_payment_id is not None:
+        query = query.filter(Payment.id != exclude_payment_id)
+    return query.scalar()
+
+
+def _ensure_ledger(booking_id, exclude_payment_id=None):
+    # Seed from persisted payments only; the payment being recorded is added as a delta
+    with db.session.no_autoflush:
+        if BookingLedger.query.get(booking_id) is not None:
+            return
+        seed = _paid_total(booking_id, exclude_payment_id)
+    # A concurrent seed for the same booking wins; this one becomes a no-op instead of a key error
+    db.session.execute(
+        sqlite_insert(BookingLedger).values(
+            booking_id=booking_id,
+            amount_paid=seed
+        ).on_conflict_do_nothing(index_elements=[BookingLedger.booking_id])
+    )
+
+
+def amount_paid(booking):
+    """Current paid amount of a booking"""
+    _ensure_ledger(booking.id)
+    return db.session.query(BookingLedger.amount_paid).filter(
+        BookingLedger.booking_id == booking.id
+    ).scalar()
+
+
+def record_paid_payment(booking, payment):
+    """Add a payment that just became paid to the ledger and return the new total (caller commits)"""
+    _ensure_ledger(booking.id, exclude_payment_id=payment.id)
+    db.session.execute(
+        update(BookingLedger).where(BookingLedger.booking_id == booking.id).values(
+            amount_paid=BookingLedger.amount_paid + payment.amount,
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    )
+    return db.session.query(BookingLedger.amount_paid).filter(
+        BookingLedger.booking_id == booking.id
+    ).scalar()
+
+
+def payment_status_for(booking, total_paid):
+    """Booking payment status implied by a paid total"""
+    if total_paid >= booking.total_amount:
+        return PaymentStatus.PAID
+    if total_paid > 0:
+        return PaymentStatus.PARTIAL
+    return booking.payment_status
+
+
+def reconcile_ledgers(fix=False):
+    """Compare ledgers with the paid Payment rows; optionally repair mismatches (caller commits)
+
+    Returns a list of {'booking_id', 'ledger', 'payments'} entries that disagree.
+    """
+    payments = dict(db.session.query(Payment.booking_id, func.sum(Payment.amount)).filter(
+        Payment.payment_status == PaymentStatus.PAID
+    ).group_by(Payment.booking_id).all())
+    ledgers = {ledger.booking_id: ledger for ledger in BookingLedger.query.all()}
+
+    mismatches = []
+    for booking_id in set(payments) | set(ledgers):
+        expected = payments.get(booking_id) or 0.0
+        ledger = ledgers.get(booking_id)
+        recorded = ledger.amount_paid if ledger else 0.0
+        if abs(expected - recorded) <= TOLERANCE:
+            continue
+
+        mismatches.append({'booking_id': booking_id, 'ledger': recorded, 'payments': expected})
+        if fix:
+            if ledger:
+                ledger.amount_paid = expected
+            else:
+                db.session.add(BookingLedger(booking_id=booking_id, amount_paid=expected))
+
+    return mismatches
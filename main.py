@@ -3,6 +3,7 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import click
 from flask import Flask, send_from_directory, send_file
 from flask_cors import CORS
 from src.models.user import db
@@ -17,6 +18,15 @@ from src.routes.booking import booking_bp
 from src.routes.message import message_bp
 from src.routes.auth import auth_bp
 from src.routes.availability import availability_bp
+from src.routes.search_index import init_search_index
+from src.routes.geo_index import init_geo_index
+from src.routes.conversation import Conversation, rebuild_conversations
+from src.routes.ratings import recompute_all_venue_ratings
+from src.routes.rollups import VenueDailyRollup, rebuild_rollups
+from src.routes.ledger import reconcile_ledgers
+from src.routes.availability_bitmap import MAX_BITMAP_DAYS, rebuild_bitmaps
+from src.routes.holds import start_hold_sweeper
+from src.routes.booking_import import IMPORT_CHUNK_SIZE, import_bookings, import_format, parse_import_rows
 
 # Get the parent directory (where the built frontend files are)
 parent_dir = os.path.dirname(os.path.dirname(__file__))
@@ -39,11 +49,15 @@ app.register_blueprint(availability_bp)
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Slot holds: 'memory' for a single process, 'database' when several workers serve bookings
+app.config['SLOT_HOLD_BACKEND'] = os.environ.get('SLOT_HOLD_BACKEND', 'memory')
 db.init_app(app)
 
 # Initialize database and create sample data
 with app.app_context():
     db.create_all()
+    init_search_index()
+    init_geo_index()
     
     # Create default event types if they don't exist
     if EventType.query.count() == 0:
@@ -58,6 +72,72 @@ with app.app_context():
         for event_type in event_types:
             db.session.add(event_type)
         db.session.commit()
+    
+    # Build conversation summaries for databases created before they existed
+    if Conversation.query.count() == 0 and Message.query.count() > 0:
+        rebuild_conversations()
+        db.session.commit()
+    
+    # Build booking rollups for databases created before they existed
+    if VenueDailyRollup.query.count() == 0 and Booking.query.count() > 0:
+        rebuild_rollups()
+        db.session.commit()
+
+# Remove expired checkout holds in the background (once per worker process)
+start_hold_sweeper(app)
+
+@app.cli.command('rebuild-conversations')
+def rebuild_conversations_command():
+    """Recompute inbox summaries from the message history"""
+    count = rebuild_conversations()
+    db.session.commit()
+    print(f"Rebuilt {count} conversation summaries")
+
+@app.cli.command('recompute-ratings')
+def recompute_ratings_command():
+    """Rebuild venue rating aggregates from approved reviews"""
+    count = recompute_all_venue_ratings()
+    db.session.commit()
+    print(f"Recomputed ratings for {count} venues")
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Rebuild per-venue daily booking rollups from bookings and payments"""
+    count = rebuild_rollups()
+    db.session.commit()
+    print(f"Rebuilt {count} daily rollup rows")
+
+@app.cli.command('rebuild-bitmaps')
+@click.option('--days', default=MAX_BITMAP_DAYS, show_default=True, help='Upcoming days to precompute per active venue')
+def rebuild_bitmaps_command(days):
+    """Recompute availability bitmaps from bookings, blocks and hours and precompute upcoming days"""
+    changed = rebuild_bitmaps(days)
+    print(f"Wrote {changed} availability bitmap rows")
+
+@app.cli.command('reconcile-payments')
+@click.option('--fix', is_flag=True, help='Overwrite mismatched ledgers with the payment totals')
+def reconcile_payments_command(fix):
+    """Check booking paid-amount ledgers against paid Payment rows"""
+    mismatches = reconcile_ledgers(fix=fix)
+    for mismatch in mismatches:
+        print(f"Booking {mismatch['booking_id']}: ledger {mismatch['ledger']} != payments {mismatch['payments']}")
+    if fix:
+        db.session.commit()
+    print(f"{len(mismatches)} mismatched ledgers{' repaired' if fix else ''}")
+
+@app.cli.command('import-bookings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help='Bookings committed per transaction')
+def import_bookings_command(path, chunk_size):
+    """Import bookings from a CSV, JSON lines or JSON file"""
+    with open(path, encoding='utf-8') as f:
+        rows = parse_import_rows(f.read(), import_format(None, path))
+    results = import_bookings(rows, chunk_size=chunk_size)
+    for result in results:
+        if result['status'] == 'error':
+            print(f"Row {result['row']}: {result['error']}")
+    created = sum(1 for result in results if result['status'] == 'created')
+    print(f"Imported {created} of {len(results)} bookings")
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -5,9 +5,21 @@ from src.models.booking import Booking
 from src.models.message import Message, Review, MessageType, MessageStatus
 from datetime import datetime
 from sqlalchemy import and_, or_
+from sqlalchemy.orm import selectinload
+from src.routes.pagination import cursor_requested, encode_cursor, keyset_page, older_than
+from src.routes.conversation import Conversation, record_message, mark_read, mark_conversation_read
+from src.routes.ratings import apply_rating_change, get_rating_stats, is_counted
+from src.routes.venue_serializer import serialize_venues, venue_view
+from src.routes.fields import FieldSet, requested_fields
 
 message_bp = Blueprint('message', __name__)
 
+# Review fields clients may request with fields= (plus 'customer' for the compact card)
+REVIEW_FIELDS = [
+    'id', 'venue_id', 'customer_id', 'booking_id', 'rating',
+    'title_en', 'title_ar', 'comment_en', 'comment_ar', 'created_at'
+]
+
 @message_bp.route('', methods=['POST'])
 def send_message():
     """Send message between users"""
@@ -49,6 +61,8 @@ def send_message():
         )
         
         db.session.add(message)
+        db.session.flush()
+        record_message(message)
         db.session.commit()
         
         return jsonify({
@@ -67,6 +81,7 @@ def get_conversation(user1_id, user2_id):
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 50))
         booking_id = request.args.get('booking_id')
+        read_up_to = request.args.get('read_up_to', type=int)
         
         # Build query
         query = Message.query.filter(
@@ -79,27 +94,16 @@ def get_conversation(user1_id, user2_id):
         if booking_id:
             query = query.filter(Message.booking_id == booking_id)
         
-        query = query.order_by(Message.created_at.desc())
-        messages = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        # Mark messages as read for the current user (assuming user1_id is current user)
-        unread_messages = Message.query.filter(
-            and_(
-                Message.sender_id == user2_id,
-                Message.receiver_id == user1_id,
-                Message.status != MessageStatus.READ
+        if cursor_requested(request.args):
+            # Keyset pagination: no OFFSET scan and no COUNT query
+            message_items, pagination = keyset_page(
+                query, Message, per_page, request.args.get('before'), request.args.get('after')
             )
-        ).all()
-        
-        for msg in unread_messages:
-            msg.status = MessageStatus.READ
-            msg.read_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            'messages': [message.to_dict() for message in reversed(messages.items)],
-            'pagination': {
+        else:
+            query = query.order_by(Message.created_at.desc())
+            messages = query.paginate(page=page, per_page=per_page, error_out=False)
+            message_items = messages.items
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': messages.total,
@@ -107,59 +111,97 @@ def get_conversation(user1_id, user2_id):
                 'has_next': messages.has_next,
                 'has_prev': messages.has_prev
             }
+        
+        # Mark messages as read for the current user (assuming user1_id is current user)
+        marked_read = mark_conversation_read(user1_id, user2_id, read_up_to)
+        
+        # Serialize before committing so the page is not reloaded row by row
+        message_data = [message.to_dict() for message in reversed(message_items)]
+        db.session.commit()
+        
+        return jsonify({
+            'messages': message_data,
+            'marked_read': marked_read,
+            'pagination': pagination
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@message_bp.route('/conversation/<int:user1_id>/<int:user2_id>/read', methods=['POST'])
+def mark_conversation_as_read(user1_id, user2_id):
+    """Mark messages from user2 to user1 as read, optionally up to a message id"""
+    try:
+        data = request.json or {}
+        up_to_message_id = data.get('up_to_message_id')
+        
+        marked_read = mark_conversation_read(user1_id, user2_id, up_to_message_id)
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Messages marked as read',
+            'marked_read': marked_read
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @message_bp.route('/conversations/<int:user_id>', methods=['GET'])
 def get_user_conversations(user_id):
     """Get all conversations for a user"""
     try:
-        # Get unique conversation partners
-        sent_to = db.session.query(Message.receiver_id).filter(Message.sender_id == user_id).distinct()
-        received_from = db.session.query(Message.sender_id).filter(Message.receiver_id == user_id).distinct()
+        limit = request.args.get('limit', type=int)
+        before = request.args.get('before')
         
-        partner_ids = set()
-        for row in sent_to:
-            partner_ids.add(row[0])
-        for row in received_from:
-            partner_ids.add(row[0])
+        # Single indexed range read over the user's conversation summaries
+        query = db.session.query(Conversation, Message, User).join(
+            Message, Message.id == Conversation.last_message_id
+        ).join(
+            User, User.id == Conversation.partner_id
+        ).filter(Conversation.user_id == user_id)
         
-        conversations = []
-        for partner_id in partner_ids:
-            # Get last message
-            last_message = Message.query.filter(
-                or_(
-                    and_(Message.sender_id == user_id, Message.receiver_id == partner_id),
-                    and_(Message.sender_id == partner_id, Message.receiver_id == user_id)
-                )
-            ).order_by(Message.created_at.desc()).first()
-            
-            # Get unread count
-            unread_count = Message.query.filter(
-                and_(
-                    Message.sender_id == partner_id,
-                    Message.receiver_id == user_id,
-                    Message.status != MessageStatus.READ
-                )
-            ).count()
-            
-            # Get partner info
-            partner = User.query.get(partner_id)
-            
-            if last_message and partner:
-                conversations.append({
-                    'partner': partner.to_dict(),
-                    'last_message': last_message.to_dict(),
-                    'unread_count': unread_count
-                })
+        if before:
+            query = query.filter(older_than(Conversation.last_message_at, Conversation.id, before))
         
-        # Sort by last message time
-        conversations.sort(key=lambda x: x['last_message']['created_at'], reverse=True)
+        query = query.order_by(Conversation.last_message_at.desc(), Conversation.id.desc())
+        if limit:
+            query = query.limit(limit + 1)
         
-        return jsonify(conversations), 200
+        rows = query.all()
+        has_next = bool(limit) and len(rows) > limit
+        rows = rows[:limit] if limit else rows
         
+        conversations = []
+        for conversation, last_message, partner in rows:
+            conversations.append({
+                'partner': partner.to_dict(),
+                'last_message': last_message.to_dict(),
+                'unread_count': conversation.unread_count
+            })
+        
+        # Plain list unless the client asked for keyset pagination
+        if not limit and not before:
+            return jsonify(conversations), 200
+        
+        next_cursor = None
+        if has_next:
+            conversation = rows[-1][0]
+            next_cursor = encode_cursor(conversation.last_message_at, conversation.id)
+        
+        return jsonify({
+            'conversations': conversations,
+            'pagination': {
+                'limit': limit,
+                'has_next': has_next,
+                'next_cursor': next_cursor
+            }
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -172,6 +214,7 @@ def mark_message_read(message_id):
         if message.status != MessageStatus.READ:
             message.status = MessageStatus.READ
             message.read_at = datetime.utcnow()
+            mark_read(message.receiver_id, message.sender_id, 1)
             db.session.commit()
         
         return jsonify({
@@ -246,15 +289,11 @@ def create_review():
         db.session.add(review)
         
         # Update venue rating
-        venue_reviews = Review.query.filter_by(venue_id=data['venue_id'], is_approved=True).all()
-        if venue_reviews:
-            total_rating = sum(r.rating for r in venue_reviews) + rating
-            total_reviews = len(venue_reviews) + 1
-            venue.average_rating = total_rating / total_reviews
-            venue.total_reviews = total_reviews
-        else:
-            venue.average_rating = rating
-            venue.total_reviews = 1
+        if is_counted(review):
+            apply_rating_change(venue, added=rating)
+        
+        # Mark the venue changed so cached venue pages revalidate
+        venue.updated_at = datetime.utcnow()
         
         db.session.commit()
         
@@ -268,6 +307,18 @@ def create_review():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def compact_customer(customer, language='ar'):
+    """Reviewer card shown next to a review instead of the full profile"""
+    if customer is None:
+        return None
+    english = language == 'en'
+    return {
+        'id': customer.id,
+        'first_name': customer.first_name_en if english else customer.first_name_ar,
+        'last_name': customer.last_name_en if english else customer.last_name_ar,
+        'profile_image_url': customer.profile_image_url
+    }
+
 @message_bp.route('/reviews/venue/<int:venue_id>', methods=['GET'])
 def get_venue_reviews(venue_id):
     """Get reviews for a venue"""
@@ -278,20 +329,27 @@ def get_venue_reviews(venue_id):
         
         venue = Venue.query.get_or_404(venue_id)
         
-        query = Review.query.filter_by(venue_id=venue_id, is_approved=True)
-        query = query.order_by(Review.created_at.desc())
-        reviews = query.paginate(page=page, per_page=per_page, error_out=False)
+        # With fields=, reviews are narrowed and the customer becomes an opt-in compact card
+        fields = requested_fields(request.args)
+        include_customer = fields is None or 'customer' in fields
+        review_fields = [field for field in fields if field != 'customer'] if fields else None
+        field_set = FieldSet(Review, review_fields, REVIEW_FIELDS, required=['customer_id']) if review_fields else None
         
-        review_data = []
-        for review in reviews.items:
-            review_dict = review.to_dict(language=language)
-            review_dict['customer'] = review.customer.to_dict(language=language)
-            review_data.append(review_dict)
-        
-        return jsonify({
-            'venue': venue.to_dict(language=language),
-            'reviews': review_data,
-            'pagination': {
+        query = Review.query.filter_by(venue_id=venue_id, is_approved=True)
+        if field_set:
+            query = field_set.apply(query)
+        if include_customer:
+            query = query.options(selectinload(Review.customer))
+        if cursor_requested(request.args):
+            # Keyset pagination: no OFFSET scan and no COUNT query
+            review_items, pagination = keyset_page(
+                query, Review, per_page, request.args.get('before'), request.args.get('after')
+            )
+        else:
+            query = query.order_by(Review.created_at.desc())
+            reviews = query.paginate(page=page, per_page=per_page, error_out=False)
+            review_items = reviews.items
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': reviews.total,
@@ -299,8 +357,32 @@ def get_venue_reviews(venue_id):
                 'has_next': reviews.has_next,
                 'has_prev': reviews.has_prev
             }
+        
+        review_data = []
+        for review in review_items:
+            if fields is None:
+                review_dict = review.to_dict(language=language)
+                review_dict['customer'] = review.customer.to_dict(language=language)
+            else:
+                review_dict = field_set.serialize(review, language) if field_set else {}
+                if include_customer:
+                    review_dict['customer'] = compact_customer(review.customer, language)
+            review_data.append(review_dict)
+        
+        if fields is None:
+            venue_data = venue.to_dict(language=language)
+        else:
+            venue_data = serialize_venues([venue], language, 'compact')[0]
+        
+        return jsonify({
+            'venue': venue_data,
+            'rating_summary': get_rating_stats(venue_id).to_dict(),
+            'reviews': review_data,
+            'pagination': pagination
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -309,14 +391,21 @@ def get_customer_reviews(customer_id):
     """Get reviews by a customer"""
     try:
         language = request.args.get('language', 'ar')
+        view = venue_view(request.args)
         customer = User.query.get_or_404(customer_id)
         
-        reviews = Review.query.filter_by(customer_id=customer_id).order_by(Review.created_at.desc()).all()
+        reviews = Review.query.options(selectinload(Review.venue)).filter_by(
+            customer_id=customer_id
+        ).order_by(Review.created_at.desc()).all()
+        
+        # Serialize each reviewed venue once, with one image query for all of them
+        venues = list({review.venue_id: review.venue for review in reviews}.values())
+        venue_data = dict(zip([venue.id for venue in venues], serialize_venues(venues, language, view)))
         
         review_data = []
         for review in reviews:
             review_dict = review.to_dict(language=language)
-            review_dict['venue'] = review.venue.to_dict(language=language)
+            review_dict['venue'] = venue_data[review.venue_id]
             review_data.append(review_dict)
         
         return jsonify({
@@ -324,6 +413,8 @@ def get_customer_reviews(customer_id):
             'reviews': review_data
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -338,6 +429,10 @@ def update_review(review_id):
         if review.customer_id != data.get('customer_id'):
             return jsonify({'error': 'Unauthorized'}), 403
         
+        # Remember the counted rating before any field changes reach the session
+        old_rating = review.rating
+        venue = review.venue
+        
         # Update fields
         if 'rating' in data:
             rating = data['rating']
@@ -356,12 +451,12 @@ def update_review(review_id):
         
         review.updated_at = datetime.utcnow()
         
-        # Recalculate venue rating
-        venue = review.venue
-        venue_reviews = Review.query.filter_by(venue_id=venue.id, is_approved=True).all()
-        if venue_reviews:
-            total_rating = sum(r.rating for r in venue_reviews)
-            venue.average_rating = total_rating / len(venue_reviews)
+        # Update venue rating
+        if review.rating != old_rating and is_counted(review):
+            apply_rating_change(venue, added=review.rating, removed=old_rating)
+        
+        # Mark the venue changed so cached venue pages revalidate
+        venue.updated_at = datetime.utcnow()
         
         db.session.commit()
         
@@ -389,15 +484,12 @@ def delete_review(review_id):
         venue = review.venue
         db.session.delete(review)
         
-        # Recalculate venue rating
-        venue_reviews = Review.query.filter_by(venue_id=venue.id, is_approved=True).all()
-        if venue_reviews:
-            total_rating = sum(r.rating for r in venue_reviews)
-            venue.average_rating = total_rating / len(venue_reviews)
-            venue.total_reviews = len(venue_reviews)
-        else:
-            venue.average_rating = 0.0
-            venue.total_reviews = 0
+        # Update venue rating
+        if is_counted(review):
+            apply_rating_change(venue, removed=review.rating)
+        
+        # Mark the venue changed so cached venue pages revalidate
+        venue.updated_at = datetime.utcnow()
         
         db.session.commit()
         
@@ -0,0 +1,81 @@
+"""Opaque keyset cursors over (created_at, id).
+
+A cursor encodes the sort key of the last row a client has seen, so the next
+page is fetched with an indexed range condition instead of OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) sort key as an opaque URL-safe token"""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a token from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def older_than(created_column, id_column, cursor):
+    """Rows strictly after the cursor in (created_at DESC, id DESC) order"""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        created_column < created_at,
+        and_(created_column == created_at, id_column < row_id)
+    )
+
+
+def newer_than(created_column, id_column, cursor):
+    """Rows strictly before the cursor in (created_at DESC, id DESC) order"""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        created_column > created_at,
+        and_(created_column == created_at, id_column > row_id)
+    )
+
+
+def cursor_requested(args):
+    """True when a request asks for keyset rather than page-number pagination"""
+    return 'before' in args or 'after' in args or args.get('pagination') == 'cursor'
+
+
+def keyset_page(query, model, per_page, before=None, after=None):
+    """Fetch one page in (created_at DESC, id DESC) order without OFFSET or COUNT
+
+    ``before`` pages towards older rows and ``after`` towards newer ones.
+    Returns the rows (newest first) and a pagination dict with the cursors
+    for the neighbouring pages.
+    """
+    if after:
+        rows = query.filter(newer_than(model.created_at, model.id, after)).order_by(
+            model.created_at.asc(), model.id.asc()
+        ).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        has_next = True
+        rows = list(reversed(rows[:per_page]))
+    else:
+        if before:
+            query = query.filter(older_than(model.created_at, model.id, before))
+        rows = query.order_by(
+            model.created_at.desc(), model.id.desc()
+        ).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        has_prev = bool(before)
+        rows = rows[:per_page]
+
+    return rows, {
+        'per_page': per_page,
+        'has_next': has_next and bool(rows),
+        'has_prev': has_prev and bool(rows),
+        'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if rows and has_next else None,
+        'prev_cursor': encode_cursor(rows[0].created_at, rows[0].id) if rows and has_prev else None
+    }
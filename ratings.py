@@ -0,0 +1,138 @@
+"""Running rating aggregates for venues.
+
+``VenueRatingStats`` keeps the rating sum, count and a per-star histogram of
+each venue's approved reviews. Review writes apply deltas to it inside their
+own transaction and copy the result onto ``Venue.average_rating`` and
+``Venue.total_reviews``, so no write has to rescan the venue's reviews.
+"""
+from datetime import datetime
+from sqlalchemy import func, update
+from src.models.user import db
+from src.models.venue import Venue
+from src.models.message import Review
+
+STARS = range(1, 6)
+
+
+class VenueRatingStats(db.Model):
+    __tablename__ = 'venue_rating_stats'
+
+    venue_id = db.Column(db.Integer, db.ForeignKey(Venue.id), primary_key=True)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    star_1 = db.Column(db.Integer, nullable=False, default=0)
+    star_2 = db.Column(db.Integer, nullable=False, default=0)
+    star_3 = db.Column(db.Integer, nullable=False, default=0)
+    star_4 = db.Column(db.Integer, nullable=False, default=0)
+    star_5 = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    def histogram(self):
+        return {str(star): getattr(self, f'star_{star}') or 0 for star in STARS}
+
+    def to_dict(self):
+        return {
+            'average_rating': round(self.average, 2),
+            'total_reviews': self.rating_count or 0,
+            'histogram': self.histogram()
+        }
+
+
+def is_counted(review):
+    """Only approved reviews count; a review that was never moderated is approved by default"""
+    return review.is_approved is not False
+
+
+def compute_rating_stats(venue_id):
+    """Build stats for one venue from its persisted approved reviews (not added to the session)"""
+    stats = VenueRatingStats(venue_id=venue_id, rating_sum=0, rating_count=0)
+    for star in STARS:
+        setattr(stats, f'star_{star}', 0)
+
+    # Pending review changes are applied as deltas afterwards, so they must not be flushed here
+    with db.session.no_autoflush:
+        rows = db.session.query(Review.rating, func.count(Review.id)).filter(
+            Review.venue_id == venue_id,
+            Review.is_approved == True
+        ).group_by(Review.rating).all()
+
+    for rating, count in rows:
+        stats.rating_sum += rating * count
+        stats.rating_count += count
+        if rating in STARS:
+            setattr(stats, f'star_{rating}', count)
+    return stats
+
+
+def get_rating_stats(venue_id):
+    """Stored stats for a venue, or freshly computed ones if none are stored yet"""
+    return VenueRatingStats.query.get(venue_id) or compute_rating_stats(venue_id)
+
+
+def apply_rating_change(venue, added=None, removed=None):
+    """Apply a review delta to the venue's aggregates (caller commits)
+
+    ``added`` and ``removed`` are star ratings entering or leaving the set of
+    approved reviews; an edited rating passes both.
+    """
+    with db.session.no_autoflush:
+        missing = VenueRatingStats.query.get(venue.id) is None
+    if missing:
+        db.session.add(compute_rating_stats(venue.id))
+        db.session.flush()
+
+    values = {
+        'rating_sum': VenueRatingStats.rating_sum + (added or 0) - (removed or 0),
+        'rating_count': VenueRatingStats.rating_count + (1 if added else 0) - (1 if removed else 0),
+        'updated_at': datetime.utcnow()
+    }
+    if added:
+        column = getattr(VenueRatingStats, f'star_{added}')
+        values[f'star_{added}'] = column + 1
+    if removed:
+        column = getattr(VenueRatingStats, f'star_{removed}')
+        values[f'star_{removed}'] = values.get(f'star_{removed}', column) - 1
+
+    # Increment in SQL so concurrent review writes cannot lose each other's updates
+    db.session.execute(
+        update(VenueRatingStats).where(VenueRatingStats.venue_id == venue.id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    rating_sum, rating_count = db.session.query(
+        VenueRatingStats.rating_sum, VenueRatingStats.rating_count
+    ).filter(VenueRatingStats.venue_id == venue.id).one()
+
+    venue.average_rating = rating_sum / rating_count if rating_count else 0.0
+    venue.total_reviews = rating_count
+
+
+def recompute_all_venue_ratings():
+    """Rebuild every venue's aggregates from its approved reviews (caller commits)"""
+    totals = {}
+    rows = db.session.query(Review.venue_id, Review.rating, func.count(Review.id)).filter(
+        Review.is_approved == True
+    ).group_by(Review.venue_id, Review.rating).all()
+
+    for venue_id, rating, count in rows:
+        stats = totals.setdefault(venue_id, {'venue_id': venue_id, 'rating_sum': 0, 'rating_count': 0,
+                                             **{f'star_{star}': 0 for star in STARS}})
+        stats['rating_sum'] += rating * count
+        stats['rating_count'] += count
+        if rating in STARS:
+            stats[f'star_{rating}'] = count
+
+    VenueRatingStats.query.delete()
+    for stats in totals.values():
+        db.session.add(VenueRatingStats(**stats))
+
+    for venue in Venue.query.yield_per(500):
+        stats = totals.get(venue.id)
+        venue.average_rating = stats['rating_sum'] / stats['rating_count'] if stats else 0.0
+        venue.total_reviews = stats['rating_count'] if stats else 0
+
+    return len(totals)
@@ -0,0 +1,99 @@
+"""Process-local cache for small, rarely changing reference tables.
+
+Each ``ReferenceCache`` keeps the serialized rows of one model per language,
+along with an ETag derived from the content. Committed inserts, updates and
+deletes of the model drop the cache and bump its version; a TTL bounds how
+long another process can serve data written elsewhere.
+"""
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from src.models.venue import EventType
+
+REFERENCE_CACHE_TTL = 300
+
+_caches = {}
+
+
+def _mark_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('dirty_reference_models', set()).add(type(target))
+
+
+class ReferenceCache:
+    """Serialized rows of one reference model, loaded once per language and TTL"""
+
+    def __init__(self, model, ttl=REFERENCE_CACHE_TTL):
+        self.model = model
+        self.ttl = ttl
+        self.version = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        _caches[model] = self
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, event_name, _mark_dirty)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def _load(self, language):
+        rows = self.model.query.all()
+        serialized = {row.id: row.to_dict(language=language) for row in rows}
+        active = [serialized[row.id] for row in rows if getattr(row, 'is_active', True)]
+        digest = hashlib.sha1(json.dumps(active, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return {
+            'rows': serialized,
+            'active': active,
+            'etag': digest,
+            'loaded_at': time.monotonic()
+        }
+
+    def entry(self, language):
+        with self._lock:
+            entry = self._entries.get(language)
+            version = self.version
+        if entry and time.monotonic() - entry['loaded_at'] < self.ttl:
+            return entry
+
+        entry = self._load(language)
+        with self._lock:
+            # Don't keep a snapshot that an invalidation raced past
+            if self.version == version:
+                self._entries[language] = entry
+        return entry
+
+    def active(self, language='ar'):
+        """Serialized active rows"""
+        return self.entry(language)['active']
+
+    def etag(self, language='ar'):
+        """Content hash of the active rows, stable across processes"""
+        return self.entry(language)['etag']
+
+    def get(self, row_id, language='ar'):
+        """Serialized row by id (active or not), or None"""
+        try:
+            row_id = int(row_id)
+        except (TypeError, ValueError):
+            return None
+        return self.entry(language)['rows'].get(row_id)
+
+
+event_type_cache = ReferenceCache(EventType)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    for model in session.info.pop('dirty_reference_models', ()):
+        _caches[model].invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop('dirty_reference_models', None)
@@ -0,0 +1,165 @@
+"""Atomic slot reservation for bookings.
+
+A booking is only inserted while its (venue, date) is locked. The lock is
+taken by updating a ``VenueDateLock`` row as the first write of the
+transaction: SQLite acquires its database write lock at that point and other
+databases lock the row, so the conflict check and the insert that follow
+cannot interleave with another worker's. Within a process a striped mutex
+keeps threads from queueing on the database lock.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import and_, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from src.models.user import db
+from src.models.venue import Venue
+from src.models.booking import BookingStatus
+from src.routes.conflicts import check_slot
+from src.routes.availability_bitmap import mark_booked
+from src.routes.rollups import record_booking_status
+from src.routes.holds import DEFAULT_HOLD_MINUTES, add_hold, get_hold, overlapping_holds, release_hold
+
+# Attempts and base backoff (seconds) when the database reports lock contention
+RESERVE_ATTEMPTS = 5
+RESERVE_BACKOFF = 0.05
+
+# Fixed pool of process-local mutexes; (venue, date) keys hash onto a stripe
+LOCK_STRIPES = 64
+_stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+class VenueDateLock(db.Model):
+    __tablename__ = 'venue_date_locks'
+
+    venue_id = db.Column(db.Integer, db.ForeignKey(Venue.id), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def _stripe_index(venue_id, day):
+    return hash((venue_id, day)) % LOCK_STRIPES
+
+
+def _lock_row(venue_id, day):
+    result = db.session.execute(
+        update(VenueDateLock).where(and_(
+            VenueDateLock.venue_id == venue_id,
+            VenueDateLock.date == day
+        )).values(
+            version=VenueDateLock.version + 1,
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # First reservation for this day; a concurrent insert surfaces as IntegrityError and is retried
+        db.session.add(VenueDateLock(venue_id=venue_id, date=day, version=1))
+        db.session.flush()
+
+
+@contextmanager
+def venue_date_lock(*keys):
+    """Hold the reservation locks for one or more (venue_id, date) keys until the block ends
+
+    The caller commits inside the block; anything left uncommitted is rolled
+    back on exit so the database lock is never held past the block.
+    """
+    keys = sorted(set(keys))
+    # Several keys can share a stripe; take each stripe once, in a fixed order
+    process_locks = [_stripes[index] for index in sorted({_stripe_index(*key) for key in keys})]
+    for lock in process_locks:
+        lock.acquire()
+    try:
+        for venue_id, day in keys:
+            _lock_row(venue_id, day)
+        yield
+    finally:
+        if db.session.in_transaction():
+            db.session.rollback()
+        for lock in reversed(process_locks):
+            lock.release()
+
+
+def with_reservation_retry(operation):
+    """Run operation(), retrying with backoff when lock acquisition hits contention"""
+    for attempt in range(RESERVE_ATTEMPTS):
+        try:
+            return operation()
+        except (OperationalError, IntegrityError):
+            db.session.rollback()
+            if attempt == RESERVE_ATTEMPTS - 1:
+                raise
+            time.sleep(RESERVE_BACKOFF * (2 ** attempt))
+
+
+def _check_unheld(venue_id, day, start_time, end_time, hold_token=None):
+    availability = check_slot(venue_id, day, start_time, end_time)
+    if availability['available']:
+        holds = overlapping_holds(venue_id, day, start_time, end_time, exclude_token=hold_token)
+        if holds:
+            availability = {'available': False, 'reason': 'held', 'holds': holds}
+    return availability
+
+
+def place_hold(venue_id, day, start_time, end_time, customer_id=None, minutes=DEFAULT_HOLD_MINUTES):
+    """Hold a free slot for a few minutes
+
+    Returns (hold, availability); hold is None when the slot is booked,
+    closed or already held by someone else. Commits on success.
+    """
+    def attempt():
+        with venue_date_lock((venue_id, day)):
+            availability = _check_unheld(venue_id, day, start_time, end_time)
+            if not availability['available']:
+                return None, availability
+
+            hold = add_hold(venue_id, day, start_time, end_time, customer_id, minutes)
+            db.session.commit()
+            return hold, availability
+
+    return with_reservation_retry(attempt)
+
+
+def _hold_covers(hold, booking):
+    """Whether ``hold`` belongs to the booking's customer and spans its venue, date and times"""
+    return (
+        hold['customer_id'] in (None, booking.customer_id)
+        and hold['venue_id'] == booking.venue_id
+        and hold['date'] == booking.event_date
+        and hold['start_time'] <= booking.start_time
+        and hold['end_time'] >= booking.end_time
+    )
+
+
+def reserve_booking(booking, hold_token=None):
+    """Insert a new pending booking if its slot is still free
+
+    A slot held by someone else counts as taken; the booking customer's own
+    hold (``hold_token``) is consumed instead, provided it covers the booking's
+    venue, date and times. Returns (booking, availability); booking is None
+    when the slot is taken. Commits on success.
+    """
+    hold = get_hold(hold_token) if hold_token else None
+    if hold and not _hold_covers(hold, booking):
+        hold = None
+
+    def attempt():
+        with venue_date_lock((booking.venue_id, booking.event_date)):
+            availability = _check_unheld(
+                booking.venue_id, booking.event_date, booking.start_time, booking.end_time,
+                hold_token=hold['token'] if hold else None
+            )
+            if not availability['available']:
+                return None, availability
+
+            db.session.add(booking)
+            mark_booked(booking.venue_id, booking.event_date, booking.start_time, booking.end_time)
+            record_booking_status(booking, None, BookingStatus.PENDING)
+            if hold:
+                release_hold(hold['token'])
+            db.session.commit()
+            return booking, availability
+
+    return with_reservation_retry(attempt)
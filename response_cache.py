@@ -0,0 +1,149 @@
+"""Process-local cache of public venue responses.
+
+Cached bodies are keyed by endpoint, URL arguments, normalized query string
+and language. Any committed write to a venue, venue image or review, or to
+the owner details embedded in venue pages, bumps a generation counter that
+empties the cache; a short TTL bounds how long another process can serve a
+page after a write it did not see. Responses carry an ETag and a
+Last-Modified taken from the latest venue or owner ``updated_at`` so clients
+can revalidate with a 304.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, object_session
+from src.models.user import User, db
+from src.models.venue import Venue, VenueImage
+from src.models.message import Review
+from src.routes.http_cache import conditional_response
+
+RESPONSE_CACHE_TTL = 60
+MAX_RESPONSE_CACHE_ENTRIES = 1000
+
+# Query arguments whose answer depends on live availability rather than venue content
+UNCACHED_ARGS = ['date', 'start_time', 'end_time']
+
+# User columns shown in the owner block of venue pages
+OWNER_FIELDS = [
+    'first_name_en', 'last_name_en', 'phone_number', 'whatsapp_number', 'email',
+    'business_name_en', 'business_name_ar'
+]
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_generation = 0
+
+
+def invalidate_venue_responses():
+    """Drop every cached venue response"""
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.clear()
+
+
+def _cache_key():
+    args = tuple(sorted(
+        (key, value) for key, values in request.args.lists() for value in values
+        if value != '' and key != 'language'
+    ))
+    view_args = tuple(sorted((request.view_args or {}).items()))
+    return request.endpoint, view_args, args, request.args.get('language', 'ar')
+
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry['stored_at'] >= RESPONSE_CACHE_TTL:
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def _store(key, entry, generation):
+    with _lock:
+        # A write committed while the view ran makes this body stale
+        if generation != _generation:
+            return
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_RESPONSE_CACHE_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def _last_modified():
+    venues_modified = db.session.query(func.max(Venue.updated_at)).scalar()
+    owners_modified = db.session.query(func.max(User.updated_at)).filter(
+        User.id.in_(db.session.query(Venue.owner_id))
+    ).scalar()
+    return max(filter(None, [venues_modified, owners_modified]), default=None)
+
+
+def cached_response(view):
+    """Serve a public GET view from the response cache with conditional GET support"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if any(request.args.get(arg) for arg in UNCACHED_ARGS):
+            return view(*args, **kwargs)
+
+        key = _cache_key()
+        entry = _lookup(key)
+        if entry is None:
+            generation = _generation
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            body = response.get_data()
+            entry = {
+                'body': body,
+                'mimetype': response.mimetype,
+                'etag': hashlib.sha1(body).hexdigest(),
+                'last_modified': _last_modified(),
+                'stored_at': time.monotonic()
+            }
+            _store(key, entry, generation)
+
+        return conditional_response(entry['body'], entry['etag'], entry['last_modified'], entry['mimetype'])
+
+    return wrapper
+
+
+def _mark_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['venue_responses_dirty'] = True
+
+
+for _model in (Venue, VenueImage, Review):
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event_name, _mark_dirty)
+
+
+@event.listens_for(User, 'after_update')
+def _mark_owner_dirty(mapper, connection, target):
+    # Only edits to the fields venue pages show; logins and other user writes keep the cache
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in OWNER_FIELDS):
+        _mark_dirty(mapper, connection, target)
+
+
+event.listen(User, 'after_delete', _mark_dirty)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    if session.info.pop('venue_responses_dirty', False):
+        invalidate_venue_responses()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop('venue_responses_dirty', None)
@@ -0,0 +1,139 @@
+"""Per-venue daily booking rollups for owner dashboards.
+
+``VenueDailyRollup`` keeps, for each venue and event day, the number of
+bookings in every status, the guests of active bookings and the payments
+received. Booking and payment state transitions apply deltas in the same
+transaction, so a multi-venue dashboard reads a handful of pre-aggregated
+rows instead of scanning bookings.
+"""
+from datetime import datetime
+from sqlalchemy import and_, func, update
+from src.models.user import User, db
+from src.models.venue import Venue
+from src.models.booking import Booking, Payment, BookingStatus, PaymentStatus
+
+STATUS_COLUMNS = {
+    BookingStatus.PENDING: 'pending_count',
+    BookingStatus.CONFIRMED: 'confirmed_count',
+    BookingStatus.COMPLETED: 'completed_count',
+    BookingStatus.CANCELLED: 'cancelled_count'
+}
+
+# Statuses whose guests are expected to attend
+GUEST_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
+
+ROLLUP_COLUMNS = list(STATUS_COLUMNS.values()) + ['guest_count', 'revenue']
+
+
+class VenueDailyRollup(db.Model):
+    __tablename__ = 'venue_daily_rollups'
+
+    venue_id = db.Column(db.Integer, db.ForeignKey(Venue.id), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey(User.id), nullable=False)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+    guest_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_venue_daily_rollups_owner_day', 'owner_id', 'day'),
+    )
+
+
+def _increment(venue_id, day, deltas):
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    result = db.session.execute(
+        update(VenueDailyRollup).where(and_(
+            VenueDailyRollup.venue_id == venue_id,
+            VenueDailyRollup.day == day
+        )).values(
+            updated_at=datetime.utcnow(),
+            **{column: getattr(VenueDailyRollup, column) + delta for column, delta in deltas.items()}
+        ).execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        owner_id = db.session.query(Venue.owner_id).filter(Venue.id == venue_id).scalar()
+        row = VenueDailyRollup(venue_id=venue_id, day=day, owner_id=owner_id)
+        for column in ROLLUP_COLUMNS:
+            setattr(row, column, deltas.get(column, 0))
+        db.session.add(row)
+        db.session.flush()
+
+
+def record_booking_status(booking, old_status, new_status):
+    """Move a booking between status counters (old_status is None for new bookings; caller commits)"""
+    deltas = {}
+    if old_status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[old_status]] = -1
+    if new_status in STATUS_COLUMNS:
+        column = STATUS_COLUMNS[new_status]
+        deltas[column] = deltas.get(column, 0) + 1
+
+    was_attending = old_status in GUEST_STATUSES
+    is_attending = new_status in GUEST_STATUSES
+    if was_attending != is_attending:
+        deltas['guest_count'] = booking.guest_count if is_attending else -booking.guest_count
+
+    _increment(booking.venue_id, booking.event_date, deltas)
+
+
+def record_new_bookings(bookings):
+    """Add many new pending bookings with one counter update per venue day (caller commits)"""
+    deltas = {}
+    for booking in bookings:
+        day = deltas.setdefault((booking.venue_id, booking.event_date), {'pending_count': 0, 'guest_count': 0})
+        day['pending_count'] += 1
+        day['guest_count'] += booking.guest_count
+
+    for (venue_id, day), day_deltas in deltas.items():
+        _increment(venue_id, day, day_deltas)
+
+
+def record_payment(booking, amount):
+    """Add a received payment to the booking day's revenue (caller commits)"""
+    _increment(booking.venue_id, booking.event_date, {'revenue': amount})
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from bookings and paid payments (caller commits)"""
+    rows = {}
+
+    def row_for(venue_id, owner_id, day):
+        return rows.setdefault((venue_id, day), dict(
+            venue_id=venue_id, day=day, owner_id=owner_id, **{column: 0 for column in ROLLUP_COLUMNS}
+        ))
+
+    booking_counts = db.session.query(
+        Booking.venue_id, Venue.owner_id, Booking.event_date, Booking.booking_status,
+        func.count(Booking.id), func.coalesce(func.sum(Booking.guest_count), 0)
+    ).join(Venue, Venue.id == Booking.venue_id).group_by(
+        Booking.venue_id, Venue.owner_id, Booking.event_date, Booking.booking_status
+    ).all()
+
+    for venue_id, owner_id, day, status, count, guests in booking_counts:
+        row = row_for(venue_id, owner_id, day)
+        if status in STATUS_COLUMNS:
+            row[STATUS_COLUMNS[status]] += count
+        if status in GUEST_STATUSES:
+            row['guest_count'] += guests
+
+    revenue = db.session.query(
+        Booking.venue_id, Venue.owner_id, Booking.event_date, func.sum(Payment.amount)
+    ).select_from(Payment).join(Booking, Booking.id == Payment.booking_id).join(Venue, Venue.id == Booking.venue_id).filter(
+        Payment.payment_status == PaymentStatus.PAID
+    ).group_by(Booking.venue_id, Venue.owner_id, Booking.event_date).all()
+
+    for venue_id, owner_id, day, amount in revenue:
+        row_for(venue_id, owner_id, day)['revenue'] += amount or 0
+
+    VenueDailyRollup.query.delete()
+    for row in rows.values():
+        db.session.add(VenueDailyRollup(**row))
+    return len(rows)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Yemen Qaat booking detail query count check
+Creates a booking with a payment and venue images in a temporary SQLite
+database, then counts the SQL statements GET /api/bookings/<id> executes
+with a before_cursor_execute listener. Fails if the detail view needs more
+than the joined booking query plus one IN query each for payments and
+venue images.
+
+Usage: python scripts/check_booking_queries.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from load_test_reservations import create_app, seed
+from src.models.user import db
+from src.models.venue import VenueImage
+
+MAX_BOOKING_DETAIL_QUERIES = 3
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'query_check.db'))
+        customer_id, venue_id, event_type_id = seed(app)
+
+        with app.app_context():
+            db.session.add_all([
+                VenueImage(venue_id=venue_id, image_url=f'/images/hall-{index}.jpg',
+                           image_type='main' if index == 0 else 'gallery', display_order=index)
+                for index in range(3)
+            ])
+            db.session.commit()
+
+        client = app.test_client()
+        response = client.post('/api/bookings', json={
+            'customer_id': customer_id,
+            'venue_id': venue_id,
+            'event_type_id': event_type_id,
+            'event_date': (date.today() + timedelta(days=30)).isoformat(),
+            'start_time': '18:00',
+            'end_time': '22:00',
+            'guest_count': 100
+        })
+        if response.status_code != 201:
+            print(f"❌ Could not create booking: {response.status_code} {response.get_json()}")
+            return 1
+        booking_id = response.get_json()['booking']['id']
+
+        response = client.post(f'/api/bookings/{booking_id}/payment', json={'payment_method': 'cash'})
+        if response.status_code != 201:
+            print(f"❌ Could not create payment: {response.status_code} {response.get_json()}")
+            return 1
+
+        statements = []
+
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count_query)
+        try:
+            response = client.get(f'/api/bookings/{booking_id}')
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_query)
+
+        with app.app_context():
+            db.engine.dispose()
+
+    if response.status_code != 200:
+        print(f"❌ Booking detail failed: {response.status_code} {response.get_json()}")
+        return 1
+
+    data = response.get_json()
+    print(f"Queries for booking detail: {len(statements)}")
+    for statement in statements:
+        print(f"  {' '.join(statement.split())[:120]}")
+
+    ok = len(statements) <= MAX_BOOKING_DETAIL_QUERIES and len(data['payments']) == 1
+    print("✅ Booking detail loads in a fixed number of queries" if ok else "❌ Booking detail query count check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
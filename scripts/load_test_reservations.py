@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Yemen Qaat concurrent booking load test
+Fires many simultaneous overlapping bookings for one venue and date through
+the Flask test client against a temporary SQLite database, then checks that
+exactly one succeeds, every other request gets 409, and only one booking row
+was written.
+
+Usage: python scripts/load_test_reservations.py [--requests 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+# Make the src package importable from the repository root, as run_server.py does
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+from flask import Flask
+from src.models.user import User, UserRole, db
+from src.models.venue import Venue, EventType
+from src.models.booking import Booking
+from src.routes.booking import booking_bp
+
+
+def create_app(database_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{database_path}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Let writers wait on SQLite's lock instead of failing straight away
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+    db.init_app(app)
+    app.register_blueprint(booking_bp, url_prefix='/api/bookings')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(app):
+    """Create one owner, one customer, one venue and one event type"""
+    with app.app_context():
+        owner = User(first_name_en='Load', last_name_en='Owner', first_name_ar='', last_name_ar='',
+                     email='owner@loadtest.local', phone_number='700000001', password_hash='',
+                     role=UserRole('customer'))
+        customer = User(first_name_en='Load', last_name_en='Customer', first_name_ar='', last_name_ar='',
+                        email='customer@loadtest.local', phone_number='700000002', password_hash='',
+                        role=UserRole('customer'))
+        event_type = EventType(name_en='Wedding', name_ar='زفاف', icon='wedding-rings')
+        db.session.add_all([owner, customer, event_type])
+        db.session.flush()
+
+        venue = Venue(name_en='Load Test Hall', name_ar='قاعة', owner_id=owner.id,
+                      address_en='Street', address_ar='شارع', city_en="Sana'a", city_ar='صنعاء',
+                      governorate_en="Sana'a", governorate_ar='صنعاء', capacity=500, price_per_hour=100.0)
+        db.session.add(venue)
+        db.session.commit()
+        return customer.id, venue.id, event_type.id
+
+
+def run(requests_count):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'load_test.db'))
+        customer_id, venue_id, event_type_id = seed(app)
+        event_date = (date.today() + timedelta(days=30)).isoformat()
+
+        barrier = threading.Barrier(requests_count)
+        statuses = Counter()
+        statuses_lock = threading.Lock()
+
+        def book(index):
+            # Every request overlaps every other: starts between 18:00 and 18:45, all end at 22:00
+            payload = {
+                'customer_id': customer_id,
+                'venue_id': venue_id,
+                'event_type_id': event_type_id,
+                'event_date': event_date,
+                'start_time': f"18:{(index % 4) * 15:02d}",
+                'end_time': '22:00',
+                'guest_count': 100
+            }
+            client = app.test_client()
+            barrier.wait()
+            response = client.post('/api/bookings', json=payload)
+            with statuses_lock:
+                statuses[response.status_code] += 1
+
+        threads = [threading.Thread(target=book, args=(index,)) for index in range(requests_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            stored = Booking.query.filter_by(venue_id=venue_id).count()
+            db.engine.dispose()
+
+    print(f"Responses: {dict(sorted(statuses.items()))}")
+    print(f"Bookings stored: {stored}")
+
+    ok = statuses[201] == 1 and statuses[409] == requests_count - 1 and stored == 1
+    print("✅ Exactly one booking succeeded" if ok else "❌ Reservation locking failed")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent booking load test')
+    parser.add_argument('--requests', type=int, default=200, help='Simultaneous booking requests')
+    args = parser.parse_args()
+    return run(args.requests)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Full-text venue search backed by an SQLite FTS5 table.
+
+Venue names, descriptions and addresses in both languages are indexed after
+Arabic normalization (alef/ya/ta-marbuta folding, diacritic and tatweel
+stripping), and the same normalization is applied to search terms. When FTS5
+is not available the venue routes fall back to ``ilike`` filtering.
+"""
+import re
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from src.models.user import db
+from src.models.venue import Venue
+
+SEARCH_TABLE = 'venue_search'
+SEARCH_COLUMNS = ['name_ar', 'name_en', 'description_ar', 'description_en', 'address_ar', 'address_en']
+ENGLISH_COLUMNS = ['name_en', 'description_en', 'address_en']
+
+# bm25 column weights, in SEARCH_COLUMNS order: names first, then addresses, then descriptions
+COLUMN_WEIGHTS = '10.0, 10.0, 1.0, 1.0, 3.0, 3.0'
+
+# Harakat, Quranic marks and tatweel
+_ARABIC_MARKS = re.compile('[\u0610-\u061a\u0640\u064b-\u065f\u0670\u06d6-\u06ed]')
+_ARABIC_FOLDING = str.maketrans({
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ى': 'ي',
+    'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه'
+})
+
+_fts_enabled = False
+
+
+def normalize_text(value):
+    """Fold Arabic letter variants and strip diacritics for indexing and matching"""
+    if not value:
+        return ''
+    return _ARABIC_MARKS.sub('', value).translate(_ARABIC_FOLDING).lower()
+
+
+def search_enabled():
+    return _fts_enabled
+
+
+def init_search_index():
+    """Create the FTS5 table if possible and backfill it when empty"""
+    global _fts_enabled
+
+    if db.engine.dialect.name != 'sqlite':
+        _fts_enabled = False
+        return
+
+    try:
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            f"USING fts5({', '.join(SEARCH_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+        ))
+    except OperationalError:
+        # SQLite was built without FTS5
+        db.session.rollback()
+        _fts_enabled = False
+        return
+
+    _fts_enabled = True
+    if db.session.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar() == 0:
+        rebuild_search_index()
+    db.session.commit()
+
+
+def index_venue(venue):
+    """Insert or replace a venue's row in the search index (caller commits)"""
+    if not _fts_enabled:
+        return
+
+    params = {column: normalize_text(getattr(venue, column)) for column in SEARCH_COLUMNS}
+    params['venue_id'] = venue.id
+
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :venue_id"), {'venue_id': venue.id})
+    db.session.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+        f"VALUES (:venue_id, {', '.join(':' + column for column in SEARCH_COLUMNS)})"
+    ), params)
+
+
+def rebuild_search_index():
+    """Re-index every venue (caller commits)"""
+    if not _fts_enabled:
+        return
+
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    for venue in Venue.query.yield_per(500):
+        index_venue(venue)
+
+
+def build_match_expression(search_query, language='ar'):
+    """Turn free text into an FTS5 prefix query, or None if nothing is searchable"""
+    tokens = re.findall(r'\w+', normalize_text(search_query))
+    if not tokens:
+        return None
+
+    terms = ' '.join(f'"{token}"*' for token in tokens)
+    if language == 'en':
+        return f"{{{' '.join(ENGLISH_COLUMNS)}}} : ({terms})"
+    return terms
+
+
+def search_hits(match_expression):
+    """Subquery of (venue_id, rank) for matching venues; lower rank is better"""
+    return text(
+        f"SELECT rowid AS venue_id, bm25({SEARCH_TABLE}, {COLUMN_WEIGHTS}) AS rank "
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+    ).bindparams(match=match_expression).columns(
+        venue_id=db.Integer,
+        rank=db.Float
+    ).subquery('venue_search_hits')
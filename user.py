@@ -1,14 +1,110 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db, UserRole
 from datetime import datetime
+from sqlalchemy import or_
+from src.routes.fields import FieldSet, requested_fields
+from src.routes.exports import export_columns, export_format, export_response
 
 user_bp = Blueprint('user', __name__)
 
+# Fields exposed by the admin listing's fields= and by the export
+USER_FIELDS = [
+    'id', 'first_name_en', 'last_name_en', 'first_name_ar', 'last_name_ar', 'email', 'phone_number',
+    'role', 'city_en', 'city_ar', 'governorate_en', 'governorate_ar',
+    'is_phone_verified', 'is_email_verified', 'created_at'
+]
+
+MAX_USERS_PER_PAGE = 100
+
+def parse_flag(value):
+    """Parse a true/false query argument; None when absent"""
+    if value is None or value == '':
+        return None
+    if value.lower() in ('true', '1', 'yes'):
+        return True
+    if value.lower() in ('false', '0', 'no'):
+        return False
+    raise ValueError(f'Invalid boolean value: {value}')
+
+def filtered_users_query(args):
+    """Users matching the admin listing filters (role, city, governorate, verification flags)"""
+    query = User.query
+    
+    role = args.get('role')
+    if role:
+        query = query.filter(User.role == UserRole(role))
+    
+    city = args.get('city')
+    if city:
+        query = query.filter(or_(
+            User.city_ar.ilike(f'%{city}%'),
+            User.city_en.ilike(f'%{city}%')
+        ))
+    
+    governorate = args.get('governorate')
+    if governorate:
+        query = query.filter(or_(
+            User.governorate_ar.ilike(f'%{governorate}%'),
+            User.governorate_en.ilike(f'%{governorate}%')
+        ))
+    
+    is_phone_verified = parse_flag(args.get('is_phone_verified'))
+    if is_phone_verified is not None:
+        query = query.filter(User.is_phone_verified == is_phone_verified)
+    
+    is_email_verified = parse_flag(args.get('is_email_verified'))
+    if is_email_verified is not None:
+        query = query.filter(User.is_email_verified == is_email_verified)
+    
+    return query
+
 @user_bp.route('/', methods=['GET'])
 def get_users():
-    """Get all users"""
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """Get users, paginated and filtered (admin listing)"""
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', 20)), MAX_USERS_PER_PAGE)
+        query = filtered_users_query(request.args)
+        fields = requested_fields(request.args)
+        field_set = FieldSet(User, fields, USER_FIELDS) if fields else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    language = request.args.get('language', 'ar')
+    if field_set:
+        query = field_set.apply(query)
+    
+    users = query.order_by(User.id).paginate(page=page, per_page=per_page, error_out=False)
+    
+    if field_set:
+        user_data = [field_set.serialize(user, language) for user in users.items]
+    else:
+        user_data = [user.to_dict() for user in users.items]
+    
+    return jsonify({
+        'users': user_data,
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': users.total,
+            'pages': users.pages,
+            'has_next': users.has_next,
+            'has_prev': users.has_prev
+        }
+    })
+
+@user_bp.route('/export', methods=['GET'])
+def export_users():
+    """Stream the filtered user listing as NDJSON or CSV"""
+    try:
+        query = filtered_users_query(request.args)
+        fmt = export_format(request.args)
+        columns = export_columns(request.args, USER_FIELDS, USER_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = query.with_entities(*[getattr(User, column) for column in columns]).order_by(User.id)
+    return export_response(query, columns, fmt, 'users')
 
 @user_bp.route('/', methods=['POST'])
 def create_user():
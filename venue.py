@@ -1,19 +1,44 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, UserRole, db
-from src.models.venue import Venue, VenueImage, EventType
-from src.models.booking import Booking
-from datetime import datetime, date
-from sqlalchemy import and_, or_
+from src.models.venue import Venue, VenueImage
+from src.routes.conflicts import load_day_indexes, venue_available_clause
+from src.routes.availability_bitmap import FULL_DAY_MASK, get_day_bitmaps, mask_to_ranges
+from src.routes.search_index import build_match_expression, index_venue, search_enabled, search_hits
+from src.routes.geo_index import index_venue_location, venues_within_radius
+from src.routes.reference_cache import event_type_cache
+from src.routes.http_cache import conditional_json
+from src.routes.response_cache import cached_response
+from src.routes.leaderboard import featured_venues
+from src.routes.venue_serializer import serialize_venues, venue_view
+from src.routes.fields import FieldSet, requested_fields
+from datetime import datetime, date, time
+from sqlalchemy import or_
 
 venue_bp = Blueprint('venue', __name__)
 
+# Proximity search radius defaults and limits, in kilometres
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 200.0
+
+# Fields clients may request with fields=
+VENUE_FIELDS = [
+    'id', 'name_en', 'name_ar', 'description_en', 'description_ar', 'owner_id',
+    'address_en', 'address_ar', 'city_en', 'city_ar', 'governorate_en', 'governorate_ar',
+    'latitude', 'longitude', 'capacity', 'area_sqm', 'price_per_hour', 'price_per_day',
+    'amenities', 'phone_primary', 'phone_secondary', 'whatsapp_number', 'email',
+    'average_rating', 'total_reviews', 'is_verified', 'created_at', 'images'
+]
+
 @venue_bp.route('', methods=['GET'])
+@cached_response
 def get_venues():
     """Get venues with filtering and search"""
     try:
         language = request.args.get('language', 'ar')
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
+        view = venue_view(request.args)
+        fields = requested_fields(request.args)
         
         # Filters
         city = request.args.get('city')
@@ -25,6 +50,16 @@ def get_venues():
         max_price = request.args.get('max_price', type=float)
         search_query = request.args.get('search')
         
+        # Proximity search
+        latitude = request.args.get('lat', type=float)
+        longitude = request.args.get('lng', type=float)
+        radius_km = request.args.get('radius_km', DEFAULT_RADIUS_KM, type=float)
+        
+        # Availability filter
+        available_date = request.args.get('date')
+        available_start = request.args.get('start_time')
+        available_end = request.args.get('end_time')
+        
         # Base query
         query = Venue.query.filter(Venue.is_active == True)
         
@@ -65,7 +100,30 @@ def get_venues():
                 Venue.price_per_day <= max_price
             ))
         
-        if search_query:
+        if available_date:
+            try:
+                available_date = datetime.strptime(available_date, '%Y-%m-%d').date()
+                available_start = datetime.strptime(available_start, '%H:%M').time() if available_start else None
+                available_end = datetime.strptime(available_end, '%H:%M').time() if available_end else None
+            except ValueError:
+                return jsonify({'error': 'Invalid date or time format. Use YYYY-MM-DD and HH:MM'}), 400
+            
+            if bool(available_start) != bool(available_end):
+                return jsonify({'error': 'start_time and end_time must be provided together'}), 400
+            
+            if available_start and available_end <= available_start:
+                return jsonify({'error': 'End time must be after start time'}), 400
+            
+            query = query.filter(venue_available_clause(available_date, available_start, available_end))
+        
+        match_expression = build_match_expression(search_query, language) if search_query else None
+        search_results = None
+        
+        if match_expression and search_enabled():
+            # Ranked full-text lookup instead of scanning every row with ilike
+            search_results = search_hits(match_expression)
+            query = query.join(search_results, search_results.c.venue_id == Venue.id)
+        elif search_query:
             if language == 'en':
                 query = query.filter(or_(
                     Venue.name_en.ilike(f'%{search_query}%'),
@@ -82,14 +140,50 @@ def get_venues():
                     Venue.address_en.ilike(f'%{search_query}%')
                 ))
         
-        # Order by rating and creation date
-        query = query.order_by(Venue.average_rating.desc(), Venue.created_at.desc())
+        # Order by search relevance (when searching), then rating and creation date
+        if search_results is not None:
+            query = query.order_by(search_results.c.rank, Venue.average_rating.desc(), Venue.created_at.desc())
+        else:
+            query = query.order_by(Venue.average_rating.desc(), Venue.created_at.desc())
+        
+        # Sparse fieldsets narrow the SELECT; coordinates are needed for distances
+        field_set = FieldSet(Venue, fields, VENUE_FIELDS, required=['latitude', 'longitude']) if fields else None
+        if field_set:
+            query = field_set.apply(query)
+        
+        if latitude is not None and longitude is not None:
+            if radius_km <= 0 or radius_km > MAX_RADIUS_KM:
+                return jsonify({'error': f'radius_km must be between 0 and {MAX_RADIUS_KM}'}), 400
+            
+            # Bounding-box lookup through the spatial index, exact distance for the candidates only
+            nearby = venues_within_radius(query, latitude, longitude, radius_km)
+            total = len(nearby)
+            pages = (total + per_page - 1) // per_page
+            page_items = nearby[(page - 1) * per_page:page * per_page]
+            
+            venue_data = serialize_venues([venue for venue, _ in page_items], language, view, field_set)
+            for venue_dict, (_, distance) in zip(venue_data, page_items):
+                venue_dict['distance_km'] = round(distance, 2)
+            
+            return jsonify({
+                'venues': venue_data,
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total,
+                    'pages': pages,
+                    'has_next': page < pages,
+                    'has_prev': page > 1
+                }
+            }), 200
         
         # Paginate
         venues = query.paginate(page=page, per_page=per_page, error_out=False)
         
+        venue_data = serialize_venues(venues.items, language, view, field_set)
+        
         return jsonify({
-            'venues': [venue.to_dict(language=language) for venue in venues.items],
+            'venues': venue_data,
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -100,10 +194,13 @@ def get_venues():
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @venue_bp.route('/<int:venue_id>', methods=['GET'])
+@cached_response
 def get_venue(venue_id):
     """Get venue details"""
     try:
@@ -181,6 +278,9 @@ def create_venue():
         db.session.add(venue)
         db.session.commit()
         
+        index_venue(venue)
+        index_venue_location(venue)
+        
         # Add images if provided
         if data.get('images'):
             for img_data in data['images']:
@@ -233,6 +333,8 @@ def update_venue(venue_id):
                 setattr(venue, field, data[field])
         
         venue.updated_at = datetime.utcnow()
+        index_venue(venue)
+        index_venue_location(venue)
         db.session.commit()
         
         language = data.get('language', 'ar')
@@ -260,29 +362,31 @@ def check_availability(venue_id):
         except ValueError:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
-        # Get bookings for this date
-        bookings = Booking.query.filter(
-            and_(
-                Booking.venue_id == venue_id,
-                Booking.event_date == check_date,
-                Booking.booking_status.in_(['pending', 'confirmed'])
-            )
-        ).all()
+        # Read the materialized bitmap first; only list what is booked when the day has booked slots
+        bitmap = get_day_bitmaps(venue_id, check_date, check_date)[check_date]
         
         booked_slots = []
-        for booking in bookings:
-            booked_slots.append({
-                'start_time': booking.start_time.strftime('%H:%M'),
-                'end_time': booking.end_time.strftime('%H:%M'),
-                'booking_id': booking.id,
-                'status': booking.booking_status.value
-            })
+        if bitmap.booked:
+            # Same sources as the booked mask: active bookings and booked/maintenance slots
+            index = load_day_indexes(venue_id, [check_date])[check_date]
+            for start_time, end_time, source, record in index.find_conflicts(time.min, time.max):
+                booked_slot = {
+                    'start_time': start_time.strftime('%H:%M'),
+                    'end_time': end_time.strftime('%H:%M')
+                }
+                if source == 'booking':
+                    booked_slot.update({'booking_id': record.id, 'status': record.booking_status.value})
+                else:
+                    booked_slot.update({'slot_id': record.id, 'status': record.status.value})
+                booked_slots.append(booked_slot)
         
         return jsonify({
             'venue_id': venue_id,
             'date': check_date.isoformat(),
-            'is_available': len(booked_slots) == 0,
-            'booked_slots': booked_slots
+            # Nothing booked or blocked, and the venue opens at some point that day
+            'is_available': not bitmap.booked and not bitmap.blocked and bitmap.closed != FULL_DAY_MASK,
+            'booked_slots': booked_slots,
+            'free_ranges': mask_to_ranges(bitmap.free)
         }), 200
         
     except Exception as e:
@@ -293,6 +397,7 @@ def get_owner_venues(owner_id):
     """Get venues by owner"""
     try:
         language = request.args.get('language', 'ar')
+        view = venue_view(request.args)
         
         owner = User.query.get_or_404(owner_id)
         if not owner.is_venue_owner():
@@ -302,9 +407,11 @@ def get_owner_venues(owner_id):
         
         return jsonify({
             'owner': owner.to_dict(language=language),
-            'venues': [venue.to_dict(language=language) for venue in venues]
+            'venues': serialize_venues(venues, language, view)
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -313,9 +420,9 @@ def get_event_types():
     """Get all event types"""
     try:
         language = request.args.get('language', 'ar')
-        event_types = EventType.query.filter_by(is_active=True).all()
         
-        return jsonify([event_type.to_dict(language=language) for event_type in event_types]), 200
+        # Served from the reference cache; clients revalidate with If-None-Match
+        return conditional_json(event_type_cache.active(language), event_type_cache.etag(language))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -342,6 +449,7 @@ def add_venue_image(venue_id):
         )
         
         db.session.add(image)
+        venue.updated_at = datetime.utcnow()
         db.session.commit()
         
         language = data.get('language', 'ar')
@@ -355,21 +463,22 @@ def add_venue_image(venue_id):
         return jsonify({'error': str(e)}), 500
 
 @venue_bp.route('/featured', methods=['GET'])
+@cached_response
 def get_featured_venues():
     """Get featured venues (highest rated)"""
     try:
         language = request.args.get('language', 'ar')
         limit = int(request.args.get('limit', 6))
+        governorate = request.args.get('governorate')
+        view = venue_view(request.args)
         
-        venues = Venue.query.filter(
-            and_(Venue.is_active == True, Venue.is_verified == True)
-        ).order_by(
-            Venue.average_rating.desc(),
-            Venue.total_reviews.desc()
-        ).limit(limit).all()
+        # Ranked in memory by the featured leaderboard; only the top rows are loaded
+        venues = featured_venues(limit, governorate)
         
-        return jsonify([venue.to_dict(language=language) for venue in venues]), 200
+        return jsonify(serialize_venues(venues, language, view)), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
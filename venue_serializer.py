@@ -0,0 +1,84 @@
+"""Batch serialization for venue lists.
+
+``serialize_venues`` loads the images of every venue on a page with a single
+``IN`` query and attaches them to the already loaded venues, so per-row
+``to_dict`` calls do not lazy-load one image list per venue. ``view=compact``
+returns a single-language card projection for list pages instead of the
+full bilingual record.
+"""
+from collections import defaultdict
+from sqlalchemy.orm.attributes import set_committed_value
+from src.models.venue import VenueImage
+
+VENUE_VIEWS = ['full', 'compact']
+
+# Image types preferred as the card picture, in order
+COVER_IMAGE_TYPES = ['main', 'cover']
+
+
+def prefetch_venue_images(venues):
+    """Load the images of all given venues in one query and attach them"""
+    venues = [venue for venue in venues if venue is not None]
+    if not venues:
+        return {}
+
+    images = defaultdict(list)
+    rows = VenueImage.query.filter(
+        VenueImage.venue_id.in_({venue.id for venue in venues})
+    ).order_by(VenueImage.venue_id, VenueImage.display_order, VenueImage.id).all()
+    for image in rows:
+        images[image.venue_id].append(image)
+
+    for venue in venues:
+        set_committed_value(venue, 'images', images.get(venue.id, []))
+    return images
+
+
+def _cover_image(images):
+    for image_type in COVER_IMAGE_TYPES:
+        for image in images:
+            if image.image_type == image_type:
+                return image.image_url
+    return images[0].image_url if images else None
+
+
+def compact_venue(venue, language='ar', images=()):
+    """Single-language card fields for list pages"""
+    english = language == 'en'
+    return {
+        'id': venue.id,
+        'name': venue.name_en if english else venue.name_ar,
+        'city': venue.city_en if english else venue.city_ar,
+        'governorate': venue.governorate_en if english else venue.governorate_ar,
+        'capacity': venue.capacity,
+        'price_per_hour': venue.price_per_hour,
+        'price_per_day': venue.price_per_day,
+        'average_rating': venue.average_rating,
+        'total_reviews': venue.total_reviews,
+        'is_verified': venue.is_verified,
+        'image_url': _cover_image(images)
+    }
+
+
+def serialize_venues(venues, language='ar', view='full', field_set=None):
+    """Serialize a page of venues with one image query for the whole page
+
+    With a ``FieldSet`` the requested fields are returned instead of ``view``;
+    images are only fetched when it falls back to ``to_dict``.
+    """
+    if field_set and field_set.direct:
+        return [field_set.serialize(venue, language) for venue in venues]
+    images = prefetch_venue_images(venues)
+    if field_set:
+        return [field_set.serialize(venue, language) for venue in venues]
+    if view == 'compact':
+        return [compact_venue(venue, language, images.get(venue.id, [])) for venue in venues]
+    return [venue.to_dict(language=language) for venue in venues]
+
+
+def venue_view(args):
+    """Validated ``view`` query argument; raises ValueError for unknown views"""
+    view = args.get('view', 'full')
+    if view not in VENUE_VIEWS:
+        raise ValueError(f"view must be one of: {', '.join(VENUE_VIEWS)}")
+    return view